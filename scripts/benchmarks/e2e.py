@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark - Run BlogGenerator against the provider simulators
+
+Each scenario generates --posts posts at one concurrency level: concurrency 1
+uses the synchronous generate() path, higher levels use generate_many().
+Every scenario gets a fresh working directory (output, images, checkpoints
+and caches) so scenarios don't share state.
+
+Reported per scenario:
+    - p50/p95 latency of each stage and of the whole post
+    - posts/hour (posts / wall-clock time)
+    - outbound calls per post (tracked calls, and HTTP requests seen by the
+      simulator including retries)
+    - Claude tokens per post: uncached input, cache reads, cache writes, output
+    - peak RSS of the process so far (the simulator runs in-process)
+
+Usage (from scripts/):
+    python -m benchmarks.e2e --profile realistic --scale 0.1 --posts 8 --concurrency 1,4
+    python -m benchmarks.e2e --compare output/benchmarks/e2e-<before>.json
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blog_generator.agent import BlogGenerator
+from blog_generator.config import get_site_config
+from blog_generator.metrics import MetricsRecorder
+from simulators import ProviderSimulator, PROFILES
+
+
+TOPIC_SUBJECTS = [
+    "Cloud cost optimisation", "Kubernetes security", "Data platform migration",
+    "AI governance", "Serverless architecture", "Observability strategy",
+    "Zero trust networking", "MLOps pipelines", "Edge computing", "FinOps practices",
+]
+
+
+CLAUDE_TOKEN_FIELDS = ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens")
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile (q in 0-100), None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def topics_for(count: int) -> List[str]:
+    return [
+        f"{TOPIC_SUBJECTS[i % len(TOPIC_SUBJECTS)]} in {2026 + i // len(TOPIC_SUBJECTS)}"
+        for i in range(count)
+    ]
+
+
+def summarize(records: List[Dict[str, Any]], posts: int) -> Dict[str, Any]:
+    """Latency percentiles and call counts from one scenario's metric records"""
+    totals = [r["duration_ms"] for r in records if r["type"] == "run" and r["status"] == "ok"]
+    stage_runs: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    calls: Dict[str, int] = defaultdict(int)
+    tokens: Dict[str, int] = defaultdict(int)
+    for record in records:
+        if record["type"] == "stage":
+            stage_runs[record["stage"]][record["run"]] += record["duration_ms"]
+        elif record["type"] == "call" and record.get("cache") != "hit":
+            calls[f"{record['provider']}.{record['operation']}"] += 1
+            if record["provider"] == "anthropic":
+                for field in CLAUDE_TOKEN_FIELDS:
+                    tokens[field] += record.get(field, 0)
+
+    return {
+        "total_ms": {"p50": percentile(totals, 50), "p95": percentile(totals, 95)},
+        "stages_ms": {
+            stage: {"p50": percentile(list(runs.values()), 50), "p95": percentile(list(runs.values()), 95)}
+            for stage, runs in stage_runs.items()
+        },
+        "calls_per_post": {name: round(count / posts, 2) for name, count in sorted(calls.items())},
+        "claude_tokens_per_post": {field: round(tokens[field] / posts) for field in CLAUDE_TOKEN_FIELDS},
+    }
+
+
+def run_scenario(args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    """Generate args.posts posts at one concurrency level against a fresh simulator"""
+    with tempfile.TemporaryDirectory(prefix="blog-bench-") as workdir, \
+            ProviderSimulator(args.profile, seed=args.seed, scale=args.scale) as simulator:
+        site_config = simulator.site_config(dataclasses.replace(
+            get_site_config(args.site),
+            output_dir=os.path.join(workdir, "posts"),
+            images_dir=os.path.join(workdir, "images"),
+        ))
+        api_config = simulator.api_config(
+            parallel_sections=args.parallel_sections,
+            stream_writer=args.stream,
+            draft_dir=os.path.join(workdir, "drafts"),
+            llm_cache_dir=os.path.join(workdir, "cache"),
+            retry_base_delay=0.1 * args.scale,
+        )
+        if args.section_research_tokens is not None:
+            api_config = dataclasses.replace(api_config, section_research_tokens=args.section_research_tokens)
+        if args.no_quotas:
+            api_config = dataclasses.replace(api_config, **{
+                name: 0 for name in (
+                    "anthropic_requests_per_minute", "anthropic_tokens_per_minute",
+                    "tavily_requests_per_minute", "imagen_requests_per_minute",
+                    "ghost_requests_per_minute",
+                )
+            })
+        metrics = MetricsRecorder()
+        generator = BlogGenerator(
+            site_config,
+            api_config=api_config,
+            checkpoint_dir=os.path.join(workdir, "checkpoints"),
+            metrics=metrics,
+        )
+        topics = [
+            {"topic": topic, "word_count": args.words, "image_count": args.images}
+            for topic in topics_for(args.posts)
+        ]
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if concurrency == 1:
+                results = [generator.generate(**topic) for topic in topics]
+            else:
+                results = generator.generate_many(topics, max_concurrency=concurrency)
+        wall = time.perf_counter() - start
+
+        succeeded = sum(1 for result in results if result.get("success"))
+        return {
+            "mode": "generate" if concurrency == 1 else "generate_many",
+            "concurrency": concurrency,
+            "posts": args.posts,
+            "succeeded": succeeded,
+            "wall_s": round(wall, 3),
+            "posts_per_hour": round(succeeded / wall * 3600, 1) if wall else None,
+            **summarize(metrics.records, args.posts),
+            "http_requests_per_post": {
+                provider: round(count / args.posts, 2) for provider, count in sorted(simulator.calls.items())
+            },
+            "simulated_failures": dict(simulator.failures),
+            "peak_rss_mb": peak_rss_mb(),
+            "errors": [result["error"] for result in results if not result.get("success")],
+        }
+
+
+def format_ms(value: Optional[float]) -> str:
+    return f"{value / 1000:.2f}" if value is not None else "-"
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Plain-text table of each scenario, with % change against a baseline report"""
+    previous = {s["concurrency"]: s for s in (baseline or {}).get("scenarios", [])}
+
+    def change(current: Optional[float], before: Optional[float]) -> str:
+        if current is None or not before:
+            return ""
+        return f" ({(current - before) / before * 100:+.0f}%)"
+
+    lines = []
+    for scenario in report["scenarios"]:
+        before = previous.get(scenario["concurrency"], {})
+        lines.append(
+            f"== concurrency {scenario['concurrency']} ({scenario['mode']}): "
+            f"{scenario['succeeded']}/{scenario['posts']} posts in {scenario['wall_s']:.1f}s, "
+            f"{scenario['posts_per_hour']} posts/hour"
+            f"{change(scenario['posts_per_hour'], before.get('posts_per_hour'))}, "
+            f"peak RSS {scenario['peak_rss_mb']} MB"
+        )
+        lines.append(f"{'STAGE':<16}{'p50 s':>10}{'p95 s':>10}")
+        rows = dict(scenario["stages_ms"], total=scenario["total_ms"])
+        before_rows = dict(before.get("stages_ms", {}), total=before.get("total_ms", {}))
+        for name, entry in rows.items():
+            lines.append(
+                f"{name:<16}{format_ms(entry['p50']):>10}{format_ms(entry['p95']):>10}"
+                f"{change(entry['p95'], before_rows.get(name, {}).get('p95'))}"
+            )
+        lines.append("Calls per post: " + ", ".join(
+            f"{name}={count:g}" for name, count in scenario["calls_per_post"].items()
+        ))
+        lines.append("Claude tokens per post: " + ", ".join(
+            f"{name}={count}" for name, count in scenario["claude_tokens_per_post"].items()
+        ))
+        lines.append("HTTP requests per post: " + ", ".join(
+            f"{name}={count:g}" for name, count in scenario["http_requests_per_post"].items()
+        ))
+        for error in scenario["errors"][:3]:
+            lines.append(f"Error: {error}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against local simulators")
+    parser.add_argument("--profile", choices=list(PROFILES.keys()), default="realistic")
+    parser.add_argument("--scale", type=float, default=0.1, help="Multiply simulated latencies (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--site", choices=["ashganda", "cloudgeeks"], default="ashganda")
+    parser.add_argument("--posts", type=int, default=8, help="Posts per scenario (default: 8)")
+    parser.add_argument(
+        "--concurrency",
+        type=str,
+        default="1,4",
+        help="Comma-separated concurrency levels, one scenario each (default: 1,4)",
+    )
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--parallel-sections", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument(
+        "--section-research-tokens",
+        type=int,
+        help="Research budget per writer call, 0 = shared research (default: APIConfig)",
+    )
+    parser.add_argument(
+        "--no-quotas",
+        action="store_true",
+        help="Disable provider rate limits (default: APIConfig quotas, as in production)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=f"output/benchmarks/e2e-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json",
+        help="JSON results file (default: output/benchmarks/e2e-<timestamp>.json)",
+    )
+    parser.add_argument("--compare", type=str, help="Earlier results file to show changes against")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    if not levels or min(levels) < 1:
+        parser.error("--concurrency must list levels of at least 1")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "settings": {
+            key: getattr(args, key)
+            for key in ("profile", "scale", "seed", "site", "posts", "words", "images", "parallel_sections", "stream", "section_research_tokens", "no_quotas")
+        },
+        "scenarios": [],
+    }
+    for level in levels:
+        print(f"Running {args.posts} posts at concurrency {level}...")
+        report["scenarios"].append(run_scenario(args, level))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print()
+    print(format_report(report, baseline))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks - Per-post text processing over large synthetic inputs
+
+Covers the pure-Python code that runs on every post: the planner outline
+parser, the SEO and image prompt line parsers, slug building, MDX output
+and word counting. Inputs are far larger than typical responses (50-section
+outlines, 20k-word bodies) so slow paths stand out.
+
+Timings are compared against stored baselines (benchmarks/baselines/micro.json).
+Both are normalised by a fixed pure-Python calibration workload, so baselines
+recorded on one machine remain usable on a faster or slower one. The run
+fails if any benchmark is slower than its baseline by more than --threshold.
+
+Usage (from scripts/):
+    python -m benchmarks.micro                 # compare with baselines
+    python -m benchmarks.micro --update        # record new baselines
+    python -m benchmarks.micro --filter parse  # only matching benchmarks
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blog_generator.config import ASHGANDA_CONFIG
+from blog_generator.nodes.images import parse_image_prompts
+from blog_generator.nodes.output import generate_mdx_output
+from blog_generator.nodes.planner import parse_plan
+from blog_generator.nodes.seo import parse_seo, slugify
+from blog_generator.nodes.writer import count_words
+
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "micro.json"
+
+_WORDS = (
+    "cloud platform teams data model automation workload security cost latency "
+    "pipeline migration architecture strategy customers analytics adoption "
+    "integration governance performance scale reliability insight operations "
+    "infrastructure deployment monitoring compliance budget roadmap outcome "
+    "the a of and to in for with on is are can will"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_body(words: int, seed: int = 0) -> str:
+    """Markdown article of about `words` words with headings, paragraphs and lists"""
+    rng = random.Random(seed)
+    blocks, count = ["# Synthetic Benchmark Post"], 0
+    while count < words:
+        kind = rng.random()
+        if kind < 0.08:
+            block = f"## {_sentence(rng)[:-1].title()}"
+        elif kind < 0.2:
+            block = "\n".join(f"- {_sentence(rng)}" for _ in range(rng.randint(3, 6)))
+        else:
+            block = " ".join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+        blocks.append(block)
+        count += len(block.split())
+    return "\n\n".join(blocks)
+
+
+def synthetic_outline(sections: int, seed: int = 0) -> str:
+    """Planner response with `sections` numbered sections, bullets and commentary"""
+    rng = random.Random(seed)
+    lines = ["Here is a detailed outline for the post.", "", "TITLE: Synthetic Benchmark Post", "", "SECTIONS:"]
+    for i in range(1, sections + 1):
+        lines.append(f"{i}. {_sentence(rng)[:-1].title()}")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"   - {_sentence(rng)}")
+        lines.append(f"   {_sentence(rng)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def synthetic_seo_response(body: str) -> str:
+    """SEO fields after a long preamble (worst case for a line scanner)"""
+    return body + "\n\n" + "\n".join([
+        "META_DESCRIPTION: " + "Learn how teams cut cloud costs with practical steps " * 4,
+        "EXCERPT: A practical guide to cutting cloud costs.",
+        "FOCUS_KEYWORD_SHORT: cloud costs",
+        "FOCUS_KEYWORD_LONG: how to cut cloud costs",
+        "SLUG: Cutting-Cloud-Costs-Guide",
+    ])
+
+
+def synthetic_image_prompts(images: int, seed: int = 0) -> str:
+    """Image prompt response with `images` blocks separated by commentary"""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(1, images + 1):
+        blocks.append("\n".join([
+            _sentence(rng),
+            f"IMAGE {i}:",
+            f"Prompt: {' '.join(_sentence(rng) for _ in range(3))}",
+            f"Alt: {_sentence(rng)}",
+            f"Filename: image-{i}",
+            f"Aspect: {rng.choice(['16:9', '1:1', '9:16'])}",
+        ]))
+    return "\n\n".join(blocks)
+
+
+def build_benchmarks() -> Dict[str, Callable[[], Any]]:
+    """Benchmark name -> zero-argument callable"""
+    body = synthetic_body(20000)
+    outline = synthetic_outline(50)
+    seo_response = synthetic_seo_response(body)
+    image_response = synthetic_image_prompts(50)
+    titles = [_sentence(random.Random(i)) + " (2026 Edition!)" for i in range(1000)]
+    state = {
+        "title": "Synthetic Benchmark Post",
+        "meta_description": 'A "quoted" description',
+        "tags": ["AI", "Cloud"],
+        "reading_time": "100 min read",
+        "full_content": body,
+        "generated_images": [{"url": "/images/one.jpg"}, {"url": "/images/two.jpg"}],
+    }
+
+    return {
+        "parse_plan_50_sections": lambda: parse_plan(outline),
+        "parse_seo_20k_words": lambda: parse_seo(seo_response),
+        "parse_image_prompts_50": lambda: parse_image_prompts(image_response),
+        "slugify_1000_titles": lambda: [slugify(title) for title in titles],
+        "generate_mdx_output_20k_words": lambda: generate_mdx_output(state, ASHGANDA_CONFIG),
+        "count_words_20k_words": lambda: count_words(body),
+    }
+
+
+def calibration():
+    """Fixed pure-Python workload used to normalise timings across machines"""
+    total = 0
+    for i in range(20000):
+        total += len(str(i).strip().lower())
+    return total
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Best time per call in microseconds"""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=loops)) / loops * 1e6
+
+
+def load_baselines() -> Dict[str, Any]:
+    if not BASELINE_FILE.exists():
+        return {}
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for per-post text processing")
+    parser.add_argument("--update", action="store_true", help="Store these timings as the new baselines")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="Allowed slowdown against the baseline before failing (default: 0.3 = 30%%)",
+    )
+    parser.add_argument("--filter", type=str, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark (best is kept)")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks()
+    if args.filter:
+        benchmarks = {name: func for name, func in benchmarks.items() if args.filter in name}
+
+    calibration_us = measure(calibration, args.repeat)
+    results = {name: measure(func, args.repeat) for name, func in benchmarks.items()}
+
+    stored = load_baselines()
+    baselines = stored.get("benchmarks", {})
+    # >1 when this machine is slower than the one the baselines were recorded on
+    speed = calibration_us / stored["calibration_us"] if stored.get("calibration_us") else 1.0
+
+    regressions: List[str] = []
+    print(f"{'BENCHMARK':<32}{'us':>12}{'BASELINE':>12}{'CHANGE':>9}")
+    for name, value in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<32}{value:>12.1f}{'-':>12}{'':>9}")
+            continue
+        expected = baseline * speed
+        change = value / expected - 1
+        flag = "  SLOWER" if change > args.threshold else ""
+        print(f"{name:<32}{value:>12.1f}{expected:>12.1f}{change * 100:>+8.0f}%{flag}")
+        if flag:
+            regressions.append(name)
+    print(f"\nCalibration: {calibration_us:.1f} us (baselines scaled x{speed:.2f})")
+
+    if args.update:
+        # Keep baselines not re-measured (--filter), rescaled to this machine's calibration
+        updated = {name: value * speed for name, value in baselines.items()}
+        updated.update(results)
+        os.makedirs(BASELINE_FILE.parent, exist_ok=True)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump({
+                "recorded": datetime.now().isoformat(timespec="seconds"),
+                "calibration_us": round(calibration_us, 2),
+                "benchmarks": {name: round(value, 2) for name, value in sorted(updated.items())},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baselines saved to {BASELINE_FILE}")
+        return
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}: "
+              + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
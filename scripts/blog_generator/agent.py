@@ -1,50 +1,70 @@
 """
-Blog Generator Agent - LangGraph-based pipeline orchestrator
+Blog Generator Agent - Runs the pipeline stages as a dependency graph (see graph.PipelineGraph)
 """
 
-from typing import Dict, Any, Optional, Callable
+import asyncio
+from typing import Dict, Any, Awaitable, List, Optional, Callable, Union
 from datetime import datetime
 
 from .state import BlogState, create_initial_state
 from .config import SiteConfig, APIConfig, get_site_config
-from .nodes.planner import plan_node
-from .nodes.research import research_node
-from .nodes.writer import writer_node
-from .nodes.images import images_node
-from .nodes.seo import seo_node
-from .nodes.output import output_node
+from .graph import PipelineGraph, Stage
+from .checkpoint import CheckpointStore
+from .clients import ClientRegistry
+from .imaging import shutdown_pool
+from .metrics import MetricsRecorder, emit, use_recorder
+from .nodes.planner import aplan_node
+from .nodes.research import aresearch_node
+from .nodes.rank import arank_node
+from .nodes.writer import awriter_node
+from .nodes.images import aimage_prompts_node, aimages_node
+from .nodes.seo import aseo_node
+from .nodes.output import aoutput_node
 
 
 class BlogGenerator:
     """
     Orchestrates the blog generation pipeline.
 
-    Pipeline stages:
-    1. Plan - Create detailed outline
-    2. Research - Web research via Tavily
-    3. Write - Generate content with Claude
-    4. SEO - Optimize metadata
-    5. Images - Generate AI images
-    6. Output - Save MDX or publish to Ghost
+    Pipeline stages (run as a dependency graph, see build_graph):
+    1. Plan - Create detailed outline         } run concurrently
+    2. Research - Web research via Tavily     }
+    3. Rank - Dedupe and rank research locally
+       Write - Generate content with Claude
+    4. SEO - Optimize metadata                } run concurrently
+    5. Image prompts - Describe AI images     }
+    6. Images - Generate AI images
+    7. Output - Save MDX or publish to Ghost
     """
 
     def __init__(
         self,
-        site: str,
+        site: Union[str, SiteConfig],
         api_config: Optional[APIConfig] = None,
         progress_callback: Optional[Callable[[str, int], None]] = None,
+        checkpoint_dir: Optional[str] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        clients: Optional[ClientRegistry] = None,
     ):
         """
         Initialize the blog generator.
 
         Args:
-            site: Site identifier ("ashganda" or "cloudgeeks")
+            site: Site identifier ("ashganda" or "cloudgeeks"), or a SiteConfig
             api_config: API configuration (loads from env if not provided)
             progress_callback: Optional callback for progress updates (message, percentage)
+            checkpoint_dir: Directory for per-stage checkpoints (disabled if not provided)
+            metrics: Recorder for per-stage and per-call metrics (disabled if not provided)
+            clients: Shared pooled API clients (one is created if not provided).
+                Async callers should `await generator.aclose()` when done.
         """
-        self.site_config = get_site_config(site)
+        self.site_config = site if isinstance(site, SiteConfig) else get_site_config(site)
         self.api_config = api_config or APIConfig.from_env()
         self.progress_callback = progress_callback
+        self.checkpoint_dir = checkpoint_dir
+        self.metrics = metrics
+        self.clients = clients or ClientRegistry(self.api_config)
+        self.graph = self.build_graph()
 
     def _report_progress(self, message: str, percentage: int):
         """Report progress to callback if available"""
@@ -52,29 +72,163 @@ class BlogGenerator:
         if self.progress_callback:
             self.progress_callback(message, percentage)
 
-    def generate(
+    async def aclose(self):
+        """Close the pooled API connections and stop the image encoding processes"""
+        await self.clients.aclose()
+        await asyncio.to_thread(shutdown_pool)
+
+    def _run_sync(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on a fresh event loop, closing pooled clients bound to it"""
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
+
+    def build_graph(self) -> PipelineGraph:
+        """Declare the pipeline stages with the state keys each reads and writes"""
+        site_config = self.site_config
+        api_config = self.api_config
+        clients = self.clients
+
+        return PipelineGraph([
+            Stage(
+                name="plan",
+                func=lambda state: aplan_node(state, site_config, api_config, clients),
+                inputs=("topic", "primary_keyword", "target_word_count"),
+                outputs=("plan", "title", "sections_outline"),
+                message="Creating content outline...",
+                progress=10,
+            ),
+            Stage(
+                name="research",
+                func=lambda state: aresearch_node(state, site_config, api_config, clients),
+                inputs=("topic",),
+                outputs=("research_content", "academic_sources"),
+                message="Researching topic...",
+                progress=10,
+            ),
+            Stage(
+                name="rank",
+                func=lambda state: arank_node(state, site_config, api_config),
+                inputs=("topic", "primary_keyword", "sections_outline", "research_content"),
+                outputs=("ranked_research",),
+                message="Ranking research sources...",
+                progress=25,
+            ),
+            Stage(
+                name="write",
+                func=lambda state: awriter_node(state, site_config, api_config, clients),
+                inputs=(
+                    "title", "topic", "plan", "sections_outline",
+                    "ranked_research", "target_word_count",
+                ),
+                outputs=(
+                    "intro_content", "main_sections", "conclusion_content",
+                    "full_content", "word_count", "reading_time",
+                ),
+                message="Writing content...",
+                progress=30,
+            ),
+            Stage(
+                name="seo",
+                func=lambda state: aseo_node(state, site_config, api_config, clients),
+                inputs=("title", "topic", "primary_keyword", "full_content"),
+                outputs=(
+                    "meta_description", "excerpt", "focus_keyword_short",
+                    "focus_keyword_long", "slug",
+                ),
+                message="Optimizing SEO metadata...",
+                progress=60,
+            ),
+            Stage(
+                name="image_prompts",
+                func=lambda state: aimage_prompts_node(state, site_config, api_config, clients),
+                inputs=("title", "topic", "full_content", "target_image_count"),
+                outputs=("image_prompts",),
+                message="Creating image prompts...",
+                progress=60,
+            ),
+            Stage(
+                name="images",
+                func=lambda state: aimages_node(state, site_config, api_config, clients),
+                inputs=("image_prompts", "slug", "target_image_count"),
+                outputs=("generated_images", "featured_image"),
+                message="Generating {target_image_count} images...",
+                progress=75,
+            ),
+            Stage(
+                name="output",
+                func=lambda state: _as_output(aoutput_node(state, site_config, clients)),
+                inputs=(
+                    "title", "slug", "full_content", "tags", "meta_description",
+                    "excerpt", "reading_time", "featured_image", "generated_images",
+                ),
+                outputs=("output",),
+                message="Saving output...",
+                progress=90,
+            ),
+        ])
+
+    def _on_stage_start(self, stage: Stage, state: BlogState):
+        """Report progress as each stage is scheduled"""
+        self._report_progress(stage.message.format(**state), stage.progress)
+
+    async def agenerate(
         self,
         topic: str,
         primary_keyword: Optional[str] = None,
         word_count: Optional[int] = None,
         image_count: Optional[int] = None,
         tags: Optional[list] = None,
+        run_id: Optional[str] = None,
+        queue_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Generate a complete blog post.
 
+        All provider calls are made with async clients, so many posts can be
+        in flight on a single event loop. With checkpointing enabled, each
+        stage's outputs are saved as it completes and stages already saved
+        under run_id are skipped.
+
         Args:
             topic: The blog post topic
             primary_keyword: SEO keyword (defaults to topic)
             word_count: Target word count (uses site default if not specified)
             image_count: Number of images (uses site default if not specified)
             tags: List of tags (uses site default if not specified)
+            run_id: Checkpoint run id to continue (a new one is created if not provided)
+            queue_id: Topics queue entry this run is for, recorded in the checkpoint
 
         Returns:
             Dict with generation results including file path or Ghost API response
         """
         start_time = datetime.now()
 
+        checkpoint = None
+        completed = {}
+        if self.checkpoint_dir:
+            run_id = run_id or CheckpointStore.new_run_id(topic)
+            checkpoint = CheckpointStore(self.checkpoint_dir, run_id)
+            completed = checkpoint.load_stages()
+            inputs = {
+                "topic": topic,
+                "primary_keyword": primary_keyword,
+                "word_count": word_count,
+                "image_count": image_count,
+                "tags": tags,
+            }
+            checkpoint.save_run(inputs, queue_id=queue_id)
+            if completed:
+                self._report_progress(
+                    f"Resuming run {run_id} (completed: {', '.join(completed)})", 0
+                )
+
+        use_recorder(self.metrics, run=run_id or topic)
+
         # Initialize state
         state = create_initial_state(
             topic=topic,
@@ -85,41 +239,23 @@ class BlogGenerator:
         )
 
         try:
-            # Stage 1: Planning
-            self._report_progress("Creating content outline...", 10)
-            plan_result = plan_node(state, self.site_config, self.api_config)
-            state.update(plan_result)
-
-            # Stage 2: Research
-            self._report_progress("Researching topic...", 25)
-            research_result = research_node(state, self.site_config, self.api_config)
-            state.update(research_result)
-
-            # Stage 3: Writing
-            self._report_progress("Writing content...", 40)
-            writer_result = writer_node(state, self.site_config, self.api_config)
-            state.update(writer_result)
-
-            # Stage 4: SEO
-            self._report_progress("Optimizing SEO metadata...", 60)
-            seo_result = seo_node(state, self.site_config, self.api_config)
-            state.update(seo_result)
-
-            # Stage 5: Images
-            if state["target_image_count"] > 0:
-                self._report_progress(f"Generating {state['target_image_count']} images...", 75)
-                images_result = images_node(state, self.site_config, self.api_config)
-                state.update(images_result)
-            else:
-                self._report_progress("Skipping image generation...", 75)
-
-            # Stage 6: Output
-            self._report_progress("Saving output...", 90)
-            output_result = output_node(state, self.site_config)
+            state = await self.graph.run(
+                state,
+                on_stage_start=self._on_stage_start,
+                on_stage_complete=(
+                    (lambda stage, outputs: checkpoint.save_stage(stage.name, outputs))
+                    if checkpoint else None
+                ),
+                completed=completed,
+            )
+            output_result = state["output"]
+            if checkpoint:
+                checkpoint.save_run(inputs, status="completed")
 
             # Calculate duration
             duration = (datetime.now() - start_time).total_seconds()
             self._report_progress(f"Complete! Generated in {duration:.1f}s", 100)
+            emit({"type": "run", "status": "ok", "topic": topic, "duration_ms": round(duration * 1000, 1)})
 
             return {
                 "success": True,
@@ -130,16 +266,115 @@ class BlogGenerator:
                 "images_generated": len(state.get("generated_images", [])),
                 "output": output_result,
                 "duration_seconds": duration,
+                "run_id": run_id,
             }
 
         except Exception as e:
             self._report_progress(f"Error: {str(e)}", -1)
+            emit({
+                "type": "run",
+                "status": "error",
+                "topic": topic,
+                "error": str(e),
+                "duration_ms": round((datetime.now() - start_time).total_seconds() * 1000, 1),
+            })
+            if checkpoint:
+                checkpoint.save_run(inputs, status="failed", error=str(e))
             return {
                 "success": False,
                 "error": str(e),
                 "topic": topic,
+                "run_id": run_id,
             }
 
+    def generate(
+        self,
+        topic: str,
+        primary_keyword: Optional[str] = None,
+        word_count: Optional[int] = None,
+        image_count: Optional[int] = None,
+        tags: Optional[list] = None,
+        queue_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Synchronous wrapper around agenerate (see agenerate for arguments)"""
+        return self._run_sync(self.agenerate(
+            topic=topic,
+            primary_keyword=primary_keyword,
+            word_count=word_count,
+            image_count=image_count,
+            tags=tags,
+            queue_id=queue_id,
+        ))
+
+    async def aresume(self, run_id: str) -> Dict[str, Any]:
+        """
+        Resume a checkpointed run, skipping stages that already completed.
+
+        Args:
+            run_id: Run id returned by a previous agenerate call
+
+        Returns:
+            Generation result dict (see agenerate)
+        """
+        if not self.checkpoint_dir:
+            raise ValueError("Resuming requires checkpoint_dir to be set")
+
+        run = CheckpointStore(self.checkpoint_dir, run_id).load_run()
+        return await self.agenerate(**run["inputs"], run_id=run_id)
+
+    def resume(self, run_id: str) -> Dict[str, Any]:
+        """Synchronous wrapper around aresume"""
+        return self._run_sync(self.aresume(run_id))
+
+    async def agenerate_many(
+        self,
+        topics: List[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate several blog posts concurrently.
+
+        Args:
+            topics: Topic strings, or dicts of agenerate keyword arguments
+                (topic, primary_keyword, word_count, image_count, tags, queue_id)
+            max_concurrency: Maximum number of posts in flight at once
+
+        Returns:
+            One result dict per topic, in input order (see agenerate)
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            kwargs = {"topic": item} if isinstance(item, str) else dict(item)
+            async with semaphore:
+                try:
+                    return await self.agenerate(**kwargs)
+                except Exception as e:
+                    return {"success": False, "error": str(e), "topic": kwargs.get("topic")}
+
+        return await asyncio.gather(*(run_one(item) for item in topics))
+
+    def generate_many(
+        self,
+        topics: List[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around agenerate_many"""
+        return self._run_sync(self.agenerate_many(topics, max_concurrency=max_concurrency))
+
+
+async def _as_output(result: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Store the output node's result under the state's "output" key.
+
+    Output errors (e.g. a rejected Ghost publish) are raised so the stage is
+    not checkpointed as complete and a resumed run retries it.
+    """
+    output = await result
+    if output.get("error"):
+        raise RuntimeError(output["error"])
+    return {"output": output}
+
 
 def generate_blog(
     topic: str,
@@ -0,0 +1,202 @@
+"""
+Response Cache - On-disk key/value store with TTL and size-based LRU eviction
+
+Used to replay Claude responses for byte-identical requests, so reruns that
+only change later stages (e.g. output formatting) don't re-bill the pipeline,
+and to serve repeated or reworded Tavily searches locally.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+from typing import Dict, Any, List, Optional
+
+
+CACHE_MODES = ("off", "read", "readwrite")
+
+
+class DiskCache:
+    """
+    SQLite-backed JSON store.
+
+    Entries expire ttl_seconds after being written. When the stored size
+    exceeds max_bytes, the least recently read entries are evicted first.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if missing or expired"""
+        row = self._db.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+            self.misses += 1
+            return None
+
+        self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serialisable value, evicting old entries if over budget"""
+        data = json.dumps(value)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data.encode("utf-8")), now, now),
+        )
+        self._evict(now)
+        self._db.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        self._db.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        count, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": size}
+
+    def close(self):
+        self._db.close()
+
+
+class MessageCache:
+    """
+    Claude Messages cache keyed by model, temperature, max_tokens and prompt hash.
+
+    Modes:
+        off       - never used
+        read      - replay cached responses, never store new ones
+        readwrite - replay cached responses and store new ones
+    """
+
+    KEY_FIELDS = ("model", "temperature", "max_tokens", "system", "messages")
+
+    def __init__(self, store: DiskCache, mode: str = "readwrite"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}. Available: {list(CACHE_MODES)}")
+        self.store = store
+        self.mode = mode
+
+    @classmethod
+    def key(cls, request: Dict[str, Any]) -> str:
+        """Stable hash of the request fields that determine the response"""
+        material = {field: request.get(field) for field in cls.KEY_FIELDS}
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the stored response dict for request, if any"""
+        if self.mode == "off":
+            return None
+        return self.store.get(self.key(request))
+
+    def set(self, request: Dict[str, Any], response: Dict[str, Any]):
+        """Store a response dict for request (readwrite mode only)"""
+        if self.mode == "readwrite":
+            self.store.set(self.key(request), response)
+
+
+class ResearchCache:
+    """
+    Tavily search cache shared across topics and sites.
+
+    Queries are normalised (case, punctuation and word order are ignored) and
+    keyed together with include_domains, search_depth and max_results. Result
+    bodies are stored once per URL, so overlapping queries share them.
+    """
+
+    def __init__(self, queries: DiskCache, pages: DiskCache, mode: str = "readwrite"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}. Available: {list(CACHE_MODES)}")
+        self.queries = queries
+        self.pages = pages
+        self.mode = mode
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercased, de-duplicated, sorted words of the query"""
+        return " ".join(sorted(set(re.findall(r"[a-z0-9]+", query.lower()))))
+
+    @classmethod
+    def key(cls, request: Dict[str, Any]) -> str:
+        material = {
+            "query": cls.normalize_query(request.get("query", "")),
+            "include_domains": sorted(request.get("include_domains") or []),
+            "search_depth": request.get("search_depth", "basic"),
+            "max_results": request.get("max_results"),
+        }
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Rebuild a stored search response, or None if it (or any of its pages) is gone"""
+        if self.mode == "off":
+            return None
+        entry = self.queries.get(self.key(request))
+        if entry is None:
+            return None
+
+        results: List[Dict[str, Any]] = []
+        for url in entry["urls"]:
+            page = self.pages.get(url)
+            if page is None:
+                return None
+            results.append(page)
+        return {**entry["response"], "results": results}
+
+    def set(self, request: Dict[str, Any], response: Dict[str, Any]):
+        """Store a search response (readwrite mode only)"""
+        if self.mode != "readwrite":
+            return
+        results = response.get("results", [])
+        for result in results:
+            if result.get("url"):
+                self.pages.set(result["url"], result)
+        self.queries.set(self.key(request), {
+            "urls": [result["url"] for result in results if result.get("url")],
+            "response": {k: v for k, v in response.items() if k != "results"},
+        })
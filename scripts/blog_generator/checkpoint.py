@@ -0,0 +1,97 @@
+"""
+Checkpoints - Persist each stage's contribution to BlogState so runs can resume
+"""
+
+import os
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+class CheckpointStore:
+    """
+    On-disk checkpoints for a single generation run.
+
+    Layout:
+        {root}/{run_id}/run.json            - generation inputs, run status and queue id
+        {root}/{run_id}/stages/{stage}.json - outputs of each completed stage
+    """
+
+    def __init__(self, root: str, run_id: str):
+        self.root = root
+        self.run_id = run_id
+        self.run_dir = os.path.join(root, run_id)
+        self.stages_dir = os.path.join(self.run_dir, "stages")
+
+    @staticmethod
+    def new_run_id(topic: str) -> str:
+        """Create a readable, unique run id from the topic"""
+        slug = topic.lower()
+        slug = "".join(c if c.isalnum() or c == "-" else "-" for c in slug)
+        slug = "-".join(filter(None, slug.split("-")))[:40]
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return f"{timestamp}-{slug}-{uuid.uuid4().hex[:6]}"
+
+    def exists(self) -> bool:
+        """Whether this run has been started before"""
+        return os.path.exists(os.path.join(self.run_dir, "run.json"))
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        """Write JSON atomically so an interrupted run never leaves a torn file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _read_json(self, path: str) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_run(
+        self,
+        inputs: Dict[str, Any],
+        status: str = "running",
+        error: Optional[str] = None,
+        queue_id: Optional[str] = None,
+    ):
+        """Record the generation inputs and current run status (and the queue entry it is for, if any)"""
+        path = os.path.join(self.run_dir, "run.json")
+        data = self._read_json(path) if os.path.exists(path) else {
+            "run_id": self.run_id,
+            "created_at": datetime.now().isoformat(),
+        }
+        data.update({
+            "inputs": inputs,
+            "status": status,
+            "error": error,
+            "updated_at": datetime.now().isoformat(),
+        })
+        if queue_id is not None:
+            data["queue_id"] = queue_id
+        self._write_json(path, data)
+
+    def load_run(self) -> Dict[str, Any]:
+        """Load the run record (raises FileNotFoundError for unknown runs)"""
+        path = os.path.join(self.run_dir, "run.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No checkpoint found for run '{self.run_id}' in {self.root}")
+        return self._read_json(path)
+
+    def save_stage(self, stage: str, outputs: Dict[str, Any]):
+        """Persist the state keys written by a completed stage"""
+        self._write_json(os.path.join(self.stages_dir, f"{stage}.json"), outputs)
+
+    def load_stages(self) -> Dict[str, Dict[str, Any]]:
+        """Load outputs of every completed stage, keyed by stage name"""
+        if not os.path.isdir(self.stages_dir):
+            return {}
+
+        stages = {}
+        for filename in sorted(os.listdir(self.stages_dir)):
+            if filename.endswith(".json"):
+                stages[filename[:-len(".json")]] = self._read_json(
+                    os.path.join(self.stages_dir, filename)
+                )
+        return stages
@@ -0,0 +1,346 @@
+"""
+API Clients - Shared, pooled provider clients owned by BlogGenerator
+
+One ClientRegistry holds a keep-alive connection pool per provider and is
+passed to every node, so a run (or a whole batch of runs) pays for TLS
+handshakes and connection setup once instead of once per call.
+"""
+
+import os
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, Optional, AsyncIterator
+
+import anthropic
+import httpx
+
+from .cache import DiskCache, MessageCache, ResearchCache
+from .image_store import INDEX_FILENAME, ImageStore
+from .config import APIConfig
+from .metrics import CallMetrics, track_call
+from .ratelimit import ProviderLimiter, estimate_request_tokens
+
+
+class ClientRegistry:
+    """
+    Lazily-built async clients sharing pooled HTTP connections.
+
+    Clients are bound to the event loop they were created on; call aclose()
+    before that loop ends (BlogGenerator does this for its sync wrappers).
+    """
+
+    def __init__(self, api_config: Optional[APIConfig] = None):
+        self.api_config = api_config or APIConfig.from_env()
+        self._anthropic: Optional[anthropic.AsyncAnthropic] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._genai = None
+
+        config = self.api_config
+        retry = {
+            "max_retries": config.max_retries,
+            "base_delay": config.retry_base_delay,
+            "max_delay": config.retry_max_delay,
+        }
+        self.limiters: Dict[str, ProviderLimiter] = {
+            "anthropic": ProviderLimiter(
+                "anthropic",
+                config.anthropic_requests_per_minute,
+                config.anthropic_tokens_per_minute,
+                **retry,
+            ),
+            "tavily": ProviderLimiter("tavily", config.tavily_requests_per_minute, **retry),
+            "imagen": ProviderLimiter("imagen", config.imagen_requests_per_minute, **retry),
+            "ghost": ProviderLimiter("ghost", config.ghost_requests_per_minute, **retry),
+        }
+
+        self.message_cache: Optional[MessageCache] = None
+        if config.llm_cache_mode != "off":
+            store = DiskCache(
+                os.path.join(config.llm_cache_dir, "messages.sqlite"),
+                max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                ttl_seconds=config.llm_cache_ttl_hours * 3600,
+            )
+            self.message_cache = MessageCache(store, config.llm_cache_mode)
+
+        self.research_cache: Optional[ResearchCache] = None
+        if config.research_cache_mode != "off":
+            limits = {
+                "max_bytes": config.research_cache_max_mb * 1024 * 1024,
+                "ttl_seconds": config.research_cache_ttl_hours * 3600,
+            }
+            self.research_cache = ResearchCache(
+                DiskCache(os.path.join(config.llm_cache_dir, "research_queries.sqlite"), **limits),
+                DiskCache(os.path.join(config.llm_cache_dir, "research_pages.sqlite"), **limits),
+                config.research_cache_mode,
+            )
+
+        self._image_stores: Dict[str, ImageStore] = {}
+
+    def _pool_options(self) -> Dict[str, Any]:
+        """Connection pool limits and timeouts from APIConfig"""
+        config = self.api_config
+        return {
+            "limits": httpx.Limits(
+                max_connections=config.http_max_connections,
+                max_keepalive_connections=config.http_max_keepalive,
+                keepalive_expiry=config.http_keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(config.http_timeout, connect=config.http_connect_timeout),
+        }
+
+    @property
+    def anthropic(self) -> anthropic.AsyncAnthropic:
+        """Claude client with its own keep-alive pool"""
+        if self._anthropic is None:
+            self._anthropic = anthropic.AsyncAnthropic(
+                api_key=self.api_config.anthropic_api_key,
+                base_url=self.api_config.anthropic_base_url or None,
+                http_client=anthropic.DefaultAsyncHttpxClient(**self._pool_options()),
+                max_retries=0,  # Retries are handled by the provider limiter
+            )
+        return self._anthropic
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """General-purpose pooled HTTP client (Tavily, Ghost)"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(**self._pool_options())
+        return self._http
+
+    @property
+    def genai(self):
+        """Google Gen AI client for Imagen (raises ImportError if google-genai is missing)"""
+        if self._genai is None:
+            from google import genai
+            from google.genai import types
+
+            timeout = int(self.api_config.http_timeout * 1000)
+            if self.api_config.imagen_base_url:
+                # Custom endpoint (e.g. the provider simulator): Vertex express
+                # mode authenticates with an API key instead of Google credentials
+                self._genai = genai.Client(
+                    vertexai=True,
+                    api_key=os.environ.get("GOOGLE_API_KEY") or "unused",
+                    http_options=types.HttpOptions(base_url=self.api_config.imagen_base_url, timeout=timeout),
+                )
+            else:
+                self._genai = genai.Client(
+                    vertexai=True,
+                    project=self.api_config.google_project_id,
+                    location="global",  # Required for Gemini image generation
+                    http_options=types.HttpOptions(timeout=timeout),
+                )
+        return self._genai
+
+    def image_store(self, images_dir: str) -> ImageStore:
+        """Content-addressed store for images_dir (one per directory, sharing an index file)"""
+        if images_dir not in self._image_stores:
+            config = self.api_config
+            self._image_stores[images_dir] = ImageStore(
+                os.path.join(config.llm_cache_dir, INDEX_FILENAME),
+                images_dir,
+                config.image_store_mode,
+                config.image_dedup_distance,
+            )
+        return self._image_stores[images_dir]
+
+    async def aclose(self):
+        """Close every pool that was opened"""
+        if self._anthropic is not None:
+            await self._anthropic.close()
+            self._anthropic = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._genai is not None:
+            close = getattr(self._genai.aio, "aclose", None)
+            if close:
+                await close()
+            self._genai = None
+
+    async def _limited(self, provider: str, call: CallMetrics, func, tokens: float = 0):
+        """Run func under the provider's quota, counting retries on the call"""
+        def on_retry(attempt, error, delay):
+            call.retries = attempt
+            print(f"{provider} {call.operation} failed ({error}); retry {attempt} in {delay:.1f}s")
+
+        return await self.limiters[provider].call(func, tokens=tokens, on_retry=on_retry)
+
+    async def _replay_message(self, request: Dict[str, Any]) -> Optional[Any]:
+        """Return a cached response for request (recorded as a zero-cost call), if any"""
+        cached = self.message_cache.get(request) if self.message_cache else None
+        if cached is None:
+            return None
+
+        response = anthropic.types.Message.model_validate(cached)
+        async with track_call("anthropic", "messages.create", request.get("model", "")) as call:
+            # Nothing was sent, so no tokens or cost are recorded
+            call.bytes_received = len(response.content[0].text.encode("utf-8"))
+            call.extra["cache"] = "hit"
+        return response
+
+    async def create_message(self, **request) -> Any:
+        """Call the Claude Messages API, replaying from the response cache when enabled"""
+        response = await self._replay_message(request)
+        if response is not None:
+            return response
+
+        limiter = self.limiters["anthropic"]
+        estimated_tokens = estimate_request_tokens(request)
+        async with track_call("anthropic", "messages.create", request.get("model", "")) as call:
+            response = await self._limited(
+                "anthropic", call,
+                lambda: self.anthropic.messages.create(**request),
+                tokens=estimated_tokens,
+            )
+            call.record_message(response, request)
+            if self.message_cache:
+                call.extra["cache"] = "miss"
+        limiter.reconcile_tokens(estimated_tokens, call.input_tokens)
+        if self.message_cache:
+            self.message_cache.set(request, response.model_dump(mode="json"))
+        return response
+
+    async def stream_message(self, on_text: Callable[[str], None], **request) -> Any:
+        """
+        Call the Claude Messages API with streaming, passing text to on_text as it arrives.
+
+        The time to the first text chunk is recorded as ttft_ms. A retried
+        attempt streams again from the start. A cached response is passed to
+        on_text in one piece.
+        """
+        response = await self._replay_message(request)
+        if response is not None:
+            on_text(response.content[0].text)
+            return response
+
+        limiter = self.limiters["anthropic"]
+        estimated_tokens = estimate_request_tokens(request)
+        async with track_call("anthropic", "messages.stream", request.get("model", "")) as call:
+            async def send():
+                start = time.perf_counter()
+                async with self.anthropic.messages.stream(**request) as stream:
+                    async for text in stream.text_stream:
+                        if "ttft_ms" not in call.extra:
+                            call.extra["ttft_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                        on_text(text)
+                    return await stream.get_final_message()
+
+            response = await self._limited("anthropic", call, send, tokens=estimated_tokens)
+            call.record_message(response, request)
+            if self.message_cache:
+                call.extra["cache"] = "miss"
+        limiter.reconcile_tokens(estimated_tokens, call.input_tokens)
+        if self.message_cache:
+            self.message_cache.set(request, response.model_dump(mode="json"))
+        return response
+
+    async def search(self, **request) -> Dict[str, Any]:
+        """Run a Tavily search over the pooled HTTP client, served locally when cached"""
+        cache = self.research_cache
+        cached = cache.get(request) if cache else None
+        if cached is not None:
+            async with track_call("tavily", "search") as call:
+                # Nothing was sent, so no credits are recorded
+                call.bytes_received = len(json.dumps(cached).encode("utf-8"))
+                call.extra["results"] = len(cached.get("results", []))
+                call.extra["cache"] = "hit"
+            return cached
+
+        async def send():
+            response = await self.http.post(
+                f"{self.api_config.tavily_base_url.rstrip('/')}/search",
+                json=request,
+                headers={"Authorization": f"Bearer {self.api_config.tavily_api_key}"},
+            )
+            response.raise_for_status()
+            return response.json()
+
+        async with track_call("tavily", "search") as call:
+            result = await self._limited("tavily", call, send)
+            call.record_search(result, request)
+            if cache:
+                call.extra["cache"] = "miss"
+        if cache:
+            cache.set(request, result)
+        return result
+
+    async def generate_images(self, model: str, prompt: str, config: Any) -> Any:
+        """Call Imagen through the Gen AI client"""
+        async with track_call("imagen", "generate_images", model) as call:
+            response = await self._limited(
+                "imagen", call,
+                lambda: self.genai.aio.models.generate_images(
+                    model=model,
+                    prompt=prompt,
+                    config=config,
+                ),
+            )
+            call.record_images([
+                image.image.image_bytes
+                for image in response.generated_images or []
+                if image.image and image.image.image_bytes  # Safety-filtered samples have none
+            ])
+        return response
+
+    async def request(self, provider: str, operation: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Make a tracked, rate-limited HTTP request, raising on error status"""
+        async def send():
+            response = await self.http.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+
+        async with track_call(provider, operation) as call:
+            response = await self._limited(provider, call, send)
+            # Streamed bodies (e.g. file uploads) can't be re-read; their size is in the header
+            call.bytes_sent = int(response.request.headers.get("Content-Length") or 0)
+            call.bytes_received = len(response.content)
+        return response
+
+    async def upload_file(
+        self,
+        provider: str,
+        operation: str,
+        url: str,
+        path: str,
+        field: str = "file",
+        content_type: str = "application/octet-stream",
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        POST a file as multipart/form-data, streamed from disk in chunks.
+
+        The file is reopened for every attempt, so a retry sends it from the
+        start. Other keyword arguments (data, headers) go to the request.
+        """
+        async def send():
+            with open(path, "rb") as f:
+                response = await self.http.post(
+                    url, files={field: (os.path.basename(path), f, content_type)}, **kwargs
+                )
+            response.raise_for_status()
+            return response
+
+        async with track_call(provider, operation) as call:
+            response = await self._limited(provider, call, send)
+            call.bytes_sent = int(response.request.headers.get("Content-Length") or 0)
+            call.bytes_received = len(response.content)
+        return response
+
+
+@asynccontextmanager
+async def borrow_clients(
+    clients: Optional[ClientRegistry],
+    api_config: Optional[APIConfig] = None,
+) -> AsyncIterator[ClientRegistry]:
+    """Yield the given registry, or a temporary one that is closed afterwards"""
+    if clients is not None:
+        yield clients
+        return
+
+    clients = ClientRegistry(api_config)
+    try:
+        yield clients
+    finally:
+        await clients.aclose()
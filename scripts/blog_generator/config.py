@@ -4,7 +4,7 @@ Configuration for Blog Generator
 
 import os
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Tuple
 from enum import Enum
 
 
@@ -60,6 +60,78 @@ class APIConfig:
     # Model settings
     claude_model: str = "claude-sonnet-4-20250514"
 
+    # Endpoints ("" = provider default; set all three to point at a simulator)
+    anthropic_base_url: str = ""
+    tavily_base_url: str = "https://api.tavily.com"
+    imagen_base_url: str = ""
+
+    # Connection pooling (per provider pool) and timeouts in seconds
+    http_max_connections: int = 20
+    http_max_keepalive: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 120.0
+    http_connect_timeout: float = 10.0
+
+    # Provider quotas (0 = unlimited) and retry policy for 429/5xx errors
+    anthropic_requests_per_minute: int = 50
+    anthropic_tokens_per_minute: int = 30000  # input tokens
+    tavily_requests_per_minute: int = 100
+    imagen_requests_per_minute: int = 20
+    ghost_requests_per_minute: int = 0
+    max_retries: int = 5
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 60.0
+
+    # Research fan-out: concurrent Tavily searches per post and per-query timeout (seconds)
+    research_concurrency: int = 4
+    search_timeout: float = 30.0
+
+    # Image fan-out: concurrent Imagen requests per post and per-image timeout (seconds)
+    image_concurrency: int = 4
+    image_timeout: float = 120.0
+
+    # Samples generated per image in the same Imagen call (1-4); the first not safety-filtered
+    # is kept. Imagen bills every sample, so N candidates multiply image spend by N
+    image_candidates: int = 1
+
+    # Responsive variants of each image for static sites (MDX): widths, formats, encoder processes (0 = per CPU)
+    image_variant_widths: Tuple[int, ...] = (480, 960, 1600)
+    image_variant_formats: Tuple[str, ...] = ("avif", "webp")
+    image_workers: int = 0
+
+    # Research ranking: sources kept for the writer and near-duplicate threshold (Jaccard)
+    research_top_k: int = 5
+    research_dedupe_threshold: float = 0.8
+
+    # Research passages retrieved per writer call (token budget; 0 = send all research to every call)
+    section_research_tokens: int = 800
+
+    # Write body sections concurrently, then add transitions in one extra call
+    parallel_sections: bool = False
+
+    # Stream writer output into a draft file under draft_dir as it is generated
+    stream_writer: bool = False
+    draft_dir: str = "output/drafts"
+
+    # On-disk Claude response cache: off, read or readwrite
+    llm_cache_mode: str = "off"
+    llm_cache_dir: str = ".cache/blog_generator"
+    llm_cache_max_mb: int = 256
+    llm_cache_ttl_hours: float = 168.0
+
+    # On-disk Tavily search cache (same directory), shared across topics and sites
+    research_cache_mode: str = "readwrite"
+    research_cache_max_mb: int = 64
+    research_cache_ttl_hours: float = 24.0
+
+    # Content-addressed image store (index in the same directory): off, read or readwrite
+    image_store_mode: str = "readwrite"
+    # Near-duplicate reuse: a new image within this many perceptual hash bits (of 64) of a stored
+    # one reuses its file. 0 (default) shares only byte-identical images, since a distinct image
+    # that merely looks similar would otherwise be replaced
+    image_dedup_distance: int = 0
+    image_gc_min_age_hours: float = 168.0
+
     @classmethod
     def from_env(cls) -> "APIConfig":
         """Load API config from environment variables"""
@@ -69,6 +141,48 @@ class APIConfig:
             google_project_id=os.environ.get("GOOGLE_PROJECT_ID", ""),
             google_location=os.environ.get("GOOGLE_LOCATION", "us-central1"),
             claude_model=os.environ.get("CLAUDE_MODEL", "claude-sonnet-4-20250514"),
+            anthropic_base_url=os.environ.get("ANTHROPIC_BASE_URL", ""),
+            tavily_base_url=os.environ.get("TAVILY_BASE_URL", "https://api.tavily.com"),
+            imagen_base_url=os.environ.get("IMAGEN_BASE_URL", ""),
+            http_max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "20")),
+            http_max_keepalive=int(os.environ.get("HTTP_MAX_KEEPALIVE", "10")),
+            http_keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30")),
+            http_timeout=float(os.environ.get("HTTP_TIMEOUT", "120")),
+            http_connect_timeout=float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10")),
+            anthropic_requests_per_minute=int(os.environ.get("ANTHROPIC_RPM", "50")),
+            anthropic_tokens_per_minute=int(os.environ.get("ANTHROPIC_TPM", "30000")),
+            tavily_requests_per_minute=int(os.environ.get("TAVILY_RPM", "100")),
+            imagen_requests_per_minute=int(os.environ.get("IMAGEN_RPM", "20")),
+            ghost_requests_per_minute=int(os.environ.get("GHOST_RPM", "0")),
+            max_retries=int(os.environ.get("MAX_RETRIES", "5")),
+            research_concurrency=int(os.environ.get("RESEARCH_CONCURRENCY", "4")),
+            search_timeout=float(os.environ.get("SEARCH_TIMEOUT", "30")),
+            image_concurrency=int(os.environ.get("IMAGE_CONCURRENCY", "4")),
+            image_timeout=float(os.environ.get("IMAGE_TIMEOUT", "120")),
+            image_candidates=int(os.environ.get("IMAGE_CANDIDATES", "1")),
+            image_variant_widths=tuple(
+                int(width) for width in os.environ.get("IMAGE_VARIANT_WIDTHS", "480,960,1600").split(",") if width.strip()
+            ),
+            image_variant_formats=tuple(
+                fmt.strip() for fmt in os.environ.get("IMAGE_VARIANT_FORMATS", "avif,webp").split(",") if fmt.strip()
+            ),
+            image_workers=int(os.environ.get("IMAGE_WORKERS", "0")),
+            research_top_k=int(os.environ.get("RESEARCH_TOP_K", "5")),
+            research_dedupe_threshold=float(os.environ.get("RESEARCH_DEDUPE_THRESHOLD", "0.8")),
+            section_research_tokens=int(os.environ.get("SECTION_RESEARCH_TOKENS", "800")),
+            parallel_sections=os.environ.get("PARALLEL_SECTIONS", "").lower() in ("1", "true", "yes"),
+            stream_writer=os.environ.get("STREAM_WRITER", "").lower() in ("1", "true", "yes"),
+            draft_dir=os.environ.get("DRAFT_DIR", "output/drafts"),
+            llm_cache_mode=os.environ.get("LLM_CACHE_MODE", "off"),
+            llm_cache_dir=os.environ.get("LLM_CACHE_DIR", ".cache/blog_generator"),
+            llm_cache_max_mb=int(os.environ.get("LLM_CACHE_MAX_MB", "256")),
+            llm_cache_ttl_hours=float(os.environ.get("LLM_CACHE_TTL_HOURS", "168")),
+            research_cache_mode=os.environ.get("RESEARCH_CACHE_MODE", "readwrite"),
+            research_cache_max_mb=int(os.environ.get("RESEARCH_CACHE_MAX_MB", "64")),
+            research_cache_ttl_hours=float(os.environ.get("RESEARCH_CACHE_TTL_HOURS", "24")),
+            image_store_mode=os.environ.get("IMAGE_STORE_MODE", "readwrite"),
+            image_dedup_distance=int(os.environ.get("IMAGE_DEDUP_DISTANCE", "0")),
+            image_gc_min_age_hours=float(os.environ.get("IMAGE_GC_MIN_AGE_HOURS", "168")),
         )
 
 
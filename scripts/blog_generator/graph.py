@@ -0,0 +1,164 @@
+"""
+Pipeline Graph - Dependency-aware scheduling of pipeline stages
+
+Each stage declares the BlogState keys it reads (inputs) and writes (outputs).
+A stage depends on every stage that produces one of its inputs; stages whose
+dependencies are satisfied run at the same time.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from .state import BlogState
+from .metrics import track_stage
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline node together with the state keys it reads and writes"""
+    name: str
+    func: Callable[[BlogState], Awaitable[Dict[str, Any]]]
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    message: str = ""
+    progress: int = 0
+
+
+class PipelineGraph:
+    """
+    Dependency graph of pipeline stages.
+
+    Dependencies are derived from the declared inputs/outputs: a stage waits
+    for the stages producing its inputs. Inputs that no stage produces are
+    expected to be present in the initial state.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        self.dependencies = self._resolve_dependencies()
+        self.order = self._topological_order()
+
+    def _resolve_dependencies(self) -> Dict[str, Set[str]]:
+        """Map each stage to the set of stages producing its inputs"""
+        producers: Dict[str, str] = {}
+        for stage in self.stages.values():
+            for key in stage.outputs:
+                if key in producers:
+                    raise ValueError(
+                        f"State key '{key}' is produced by both "
+                        f"'{producers[key]}' and '{stage.name}'"
+                    )
+                producers[key] = stage.name
+
+        return {
+            stage.name: {
+                producers[key]
+                for key in stage.inputs
+                if key in producers and producers[key] != stage.name
+            }
+            for stage in self.stages.values()
+        }
+
+    def _topological_order(self) -> List[str]:
+        """Return stage names in dependency order, raising on cycles"""
+        order = []
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle detected between stages: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return order
+
+    async def _run_stage(self, stage: Stage, state: BlogState) -> Dict[str, Any]:
+        """Run one stage, timing it and attributing its outbound calls to it"""
+        async with track_stage(stage.name):
+            return await stage.func(state)
+
+    async def run(
+        self,
+        state: BlogState,
+        on_stage_start: Optional[Callable[[Stage, BlogState], None]] = None,
+        on_stage_complete: Optional[Callable[[Stage, Dict[str, Any]], None]] = None,
+        completed: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> BlogState:
+        """
+        Execute the graph, running independent stages concurrently.
+
+        Each stage receives a snapshot of the state taken when it is scheduled,
+        and only its declared outputs are merged back. Merging happens in this
+        coroutine, so stages never observe each other's partial updates.
+
+        Args:
+            state: Initial state (updated in place and returned)
+            on_stage_start: Optional callback invoked as each stage is scheduled
+            on_stage_complete: Optional callback invoked with each finished
+                stage's merged outputs (e.g. to checkpoint them)
+            completed: Outputs of stages finished in an earlier run, keyed by
+                stage name. These are merged without re-running, provided all
+                of the stage's dependencies were completed too.
+
+        Returns:
+            The final state
+
+        Raises:
+            The first exception raised by any stage. Stages still running are
+            cancelled and stages not yet scheduled never start.
+        """
+        done: Set[str] = set()
+        running: Dict[asyncio.Task, str] = {}
+
+        for name in self.order:
+            if name in (completed or {}) and self.dependencies[name] <= done:
+                stage = self.stages[name]
+                state.update({
+                    key: value for key, value in completed[name].items()
+                    if key in stage.outputs
+                })
+                done.add(name)
+
+        try:
+            while len(done) < len(self.stages):
+                for name in self.order:
+                    if name in done or name in running.values():
+                        continue
+                    if not self.dependencies[name] <= done:
+                        continue
+                    stage = self.stages[name]
+                    if on_stage_start:
+                        on_stage_start(stage, state)
+                    task = asyncio.create_task(self._run_stage(stage, dict(state)), name=name)
+                    running[task] = name
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    result = task.result()
+                    stage = self.stages[name]
+                    outputs = {
+                        key: value for key, value in (result or {}).items()
+                        if key in stage.outputs
+                    }
+                    state.update(outputs)
+                    done.add(name)
+                    if on_stage_complete:
+                        on_stage_complete(stage, outputs)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return state
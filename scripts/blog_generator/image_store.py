@@ -0,0 +1,369 @@
+"""
+Image Store - Content-addressed storage for generated images
+
+Images are saved under immutable names derived from their bytes
+({slug}-{sha256[:16]}.{png,jpg,webp}), so a URL never changes meaning and can be cached
+forever. A SQLite index (in the cache directory, not the published images
+directory) records:
+
+    - which stored image each prompt produced, keyed by prompt, model, aspect
+      ratio and sample number, so regenerating a post reuses its images
+      instead of paying Imagen again
+    - a perceptual hash of each stored image, so (when enabled) a new image
+      that is near-identical to a stored one reuses that file instead of
+      adding a copy
+"""
+
+import io
+import os
+import re
+import json
+import glob
+import time
+import asyncio
+import hashlib
+import sqlite3
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .cache import CACHE_MODES
+from .metrics import warn
+
+
+INDEX_FILENAME = "images.sqlite"  # In APIConfig.llm_cache_dir
+HASH_LENGTH = 16  # Hex digits of the content hash kept in filenames
+FLAT_IMAGE_RANGE = 16  # Thumbnail gray levels below which images are not perceptually compared
+
+# Formats recognised by their first bytes: (offset, magic bytes, extension, MIME type)
+IMAGE_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (0, b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (8, b"WEBP", "webp", "image/webp"),
+)
+
+# Image filenames mentioned in posts and checkpoints
+_IMAGE_REFERENCE = re.compile(r"[\w.-]+\.(?:jpe?g|png|webp|avif)", re.IGNORECASE)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_format(data: bytes) -> Tuple[str, str]:
+    """File extension and MIME type of image bytes, from their magic bytes (JPEG if unknown)"""
+    for offset, magic, extension, mime_type in IMAGE_SIGNATURES:
+        if data[offset:offset + len(magic)] == magic:
+            return extension, mime_type
+    return "jpg", "image/jpeg"
+
+
+def perceptual_hash(data: bytes) -> Optional[int]:
+    """
+    64-bit difference hash (dHash) of an image, or None if Pillow is missing,
+    the bytes don't decode, or the image is too flat to compare.
+
+    Each bit compares two horizontally adjacent pixels of a 9x8 grayscale
+    thumbnail, so re-encoding, resizing and small edits flip few bits. Only
+    gradients count, so flat images of different colours would all match.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("L", (64, 64))  # JPEG: decode at a reduced scale
+            pixels = list(image.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+    if max(pixels) - min(pixels) < FLAT_IMAGE_RANGE:
+        return None
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def referenced_images(paths: Iterable[str]) -> Set[str]:
+    """Image filenames mentioned in any file under the given files/directories"""
+    names: Set[str] = set()
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        elif os.path.isdir(path):
+            files = [os.path.join(root, name) for root, _, filenames in os.walk(path) for name in filenames]
+        else:
+            continue
+        for filepath in files:
+            with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+                names.update(_IMAGE_REFERENCE.findall(f.read()))
+    return names
+
+
+class ImageStore:
+    """
+    Content-addressed image files in images_dir, indexed in a SQLite file.
+
+    Modes (as for the response caches):
+        off       - hashed filenames only; no reuse or perceptual dedup
+        read      - reuse stored images, never index new ones
+        readwrite - reuse stored images and index new ones
+
+    One index file can serve several image directories (one per site).
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        images_dir: str,
+        mode: str = "readwrite",
+        dedup_distance: int = 0,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown image store mode: {mode}. Available: {list(CACHE_MODES)}")
+        self.images_dir = images_dir
+        self.mode = mode
+        self.dedup_distance = dedup_distance
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+        # Rows are scoped by the directory's absolute path, so the index is
+        # shared correctly by runs started from different working directories
+        self._scope = os.path.abspath(images_dir)
+        self._db: Optional[sqlite3.Connection] = None
+        if mode != "off":
+            os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(index_path)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS images (
+                    images_dir TEXT NOT NULL,
+                    sha TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    phash TEXT,
+                    size INTEGER NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (images_dir, sha)
+                )"""
+            )
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS prompts (
+                    images_dir TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    sha TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (images_dir, key)
+                )"""
+            )
+            self._db.commit()
+
+    @staticmethod
+    def prompt_key(prompt: str, model: str, aspect_ratio: str, sample: int = 0) -> str:
+        """
+        Stable hash of what determines an image.
+
+        Prompts are compared ignoring case and whitespace. sample tells apart
+        positions of one post that use the same prompt, so they keep getting
+        different images.
+        """
+        material = {
+            "prompt": " ".join(prompt.lower().split()),
+            "model": model,
+            "aspect_ratio": aspect_ratio,
+            "sample": sample,
+        }
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Filename of the image stored for a prompt key, if it is still on disk"""
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            """SELECT images.sha, images.filename FROM prompts
+               JOIN images ON images.images_dir = prompts.images_dir AND images.sha = prompts.sha
+               WHERE prompts.images_dir = ? AND prompts.key = ?""",
+            (self._scope, key),
+        ).fetchone()
+
+        if row is None or not self._exists(row):
+            self.misses += 1
+            return None
+        self._touch(row[0])
+        self.hits += 1
+        return row[1]
+
+    async def put(self, data: bytes, slug: str, key: Optional[str] = None) -> str:
+        """
+        Store image bytes and return their filename, with the extension of
+        their actual format (Imagen returns PNG unless asked for JPEG).
+
+        Byte-identical images share one file. Otherwise, with a positive
+        dedup_distance, a stored image whose perceptual hash differs in at most
+        that many bits is reused, and the reuse is recorded as a warning so it
+        shows in the metrics summary. The prompt key, if given, is pointed at the
+        result (readwrite mode).
+        """
+        sha, phash = await asyncio.to_thread(self._hashes, data)
+
+        found = self._find(sha, phash)
+        if found:
+            sha, filename = found
+            self._touch(sha)
+        else:
+            filename = f"{slug}-{sha[:HASH_LENGTH]}.{image_format(data)[0]}"
+            filepath = os.path.join(self.images_dir, filename)
+            if not os.path.exists(filepath):
+                await asyncio.to_thread(_write_bytes, filepath, data)
+            self._record_image(sha, filename, phash, len(data))
+
+        if key and self.mode == "readwrite":
+            self._db.execute(
+                "INSERT OR REPLACE INTO prompts (images_dir, key, sha, created_at) VALUES (?, ?, ?, ?)",
+                (self._scope, key, sha, time.time()),
+            )
+            self._db.commit()
+        return filename
+
+    def _hashes(self, data: bytes) -> Tuple[str, Optional[int]]:
+        """Content hash, and perceptual hash when dedup can use it (runs off the event loop)"""
+        phash = perceptual_hash(data) if self._db is not None else None
+        return content_hash(data), phash
+
+    def _find(self, sha: str, phash: Optional[int]) -> Optional[Tuple[str, str]]:
+        """(sha, filename) of a stored image that is identical or near-identical, if any"""
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            "SELECT sha, filename FROM images WHERE images_dir = ? AND sha = ?", (self._scope, sha)
+        ).fetchone()
+        if row and self._exists(row):
+            return row
+        if phash is None or self.dedup_distance <= 0:
+            return None
+
+        for stored_sha, filename, stored_phash in self._db.execute(
+            "SELECT sha, filename, phash FROM images WHERE images_dir = ? AND phash IS NOT NULL",
+            (self._scope,),
+        ).fetchall():
+            distance = bin(phash ^ int(stored_phash, 16)).count("1")
+            if distance <= self.dedup_distance and self._exists((stored_sha, filename)):
+                self.deduplicated += 1
+                warn(
+                    "image_near_duplicate",
+                    f"new image is {distance} bits from stored {filename}; reusing that file",
+                    filename=filename,
+                    distance=distance,
+                )
+                return stored_sha, filename
+        return None
+
+    def _exists(self, row: Tuple[str, str]) -> bool:
+        """Whether an indexed image is still on disk (its rows are dropped if not, in readwrite mode)"""
+        if os.path.exists(os.path.join(self.images_dir, row[1])):
+            return True
+        if self.mode == "readwrite":
+            self._forget([row[0]])
+        return False
+
+    def _record_image(self, sha: str, filename: str, phash: Optional[int], size: int):
+        if self.mode != "readwrite":
+            return
+        self._db.execute(
+            """INSERT OR REPLACE INTO images (images_dir, sha, filename, phash, size, used_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (self._scope, sha, filename, f"{phash:016x}" if phash is not None else None, size, time.time()),
+        )
+        self._db.commit()
+
+    def _touch(self, sha: str):
+        """Mark an image as just used, restarting its garbage collection grace period"""
+        if self.mode == "readwrite":
+            self._db.execute(
+                "UPDATE images SET used_at = ? WHERE images_dir = ? AND sha = ?", (time.time(), self._scope, sha)
+            )
+            self._db.commit()
+
+    def _forget(self, shas: List[str]):
+        """Drop index rows for images (and the prompt keys pointing at them)"""
+        for sha in shas:
+            self._db.execute("DELETE FROM images WHERE images_dir = ? AND sha = ?", (self._scope, sha))
+            self._db.execute("DELETE FROM prompts WHERE images_dir = ? AND sha = ?", (self._scope, sha))
+        self._db.commit()
+
+    def collect_garbage(
+        self,
+        referenced: Set[str],
+        min_age_seconds: float = 24 * 3600,
+        dry_run: bool = False,
+    ) -> List[str]:
+        """
+        Delete stored images no post references, with their variants.
+
+        Only images indexed by this store are considered, and only once they
+        have not been stored or reused for min_age_seconds, so posts still
+        being generated (or waiting to be resumed) keep theirs.
+
+        Args:
+            referenced: Image filenames still in use (see referenced_images)
+            min_age_seconds: Grace period after an image was last stored or reused
+            dry_run: Report what would be deleted without deleting it
+
+        Returns:
+            Paths of the deleted (or deletable) files
+        """
+        if self._db is None:
+            return []
+
+        cutoff = time.time() - min_age_seconds
+        removed: List[str] = []
+        unused: List[str] = []
+        for sha, filename in self._db.execute(
+            "SELECT sha, filename FROM images WHERE images_dir = ? AND used_at < ?",
+            (self._scope, cutoff),
+        ).fetchall():
+            if filename in referenced:
+                continue
+            unused.append(sha)
+            filepath = os.path.join(self.images_dir, filename)
+            stem = os.path.splitext(filepath)[0]
+            for path in [filepath] + sorted(glob.glob(f"{glob.escape(stem)}-*w.*")):
+                if os.path.exists(path):
+                    removed.append(path)
+                    if not dry_run:
+                        os.remove(path)
+
+        if unused and not dry_run:
+            self._forget(unused)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Reuse counters and stored size for this directory"""
+        count, size = 0, 0
+        if self._db is not None:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images WHERE images_dir = ?", (self._scope,)
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "images": count,
+            "bytes": size,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _write_bytes(filepath: str, data: bytes):
+    """Write bytes to a file (run off the event loop), never leaving a partial file under its name"""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(f"{filepath}.tmp", "wb") as f:
+        f.write(data)
+    os.replace(f"{filepath}.tmp", filepath)
@@ -0,0 +1,167 @@
+"""
+Imaging - Responsive WebP/AVIF variants of generated images
+
+Each generated image is re-encoded at several widths in modern formats so
+pages can serve it with srcset instead of the full-size original. Encoding
+is CPU-bound, so it runs in a process pool shared by every post in the
+process; the event loop keeps serving network calls meanwhile.
+"""
+
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .state import ImageVariant
+
+
+# Encoder settings per format: (Pillow format name, save options)
+VARIANT_ENCODERS = {
+    "avif": ("AVIF", {"quality": 55}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_warned: set = set()
+
+
+def get_pool(max_workers: int = 0) -> ProcessPoolExecutor:
+    """
+    The shared encoding pool (created on first use; 0 workers = one per CPU).
+
+    Workers are spawned rather than forked: the parent has HTTP pool and
+    cache threads that a forked child could deadlock on.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=max_workers or None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """
+    Stop the encoding pool's worker processes, waiting for queued encodes.
+
+    The next get_pool() call starts a new pool.
+    """
+    global _pool
+    # Cleared first, so encodes started meanwhile go to a new pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def supported_formats(formats: Sequence[str]) -> List[str]:
+    """The requested formats this Pillow build can encode (warns once about the rest)"""
+    try:
+        from PIL import features
+    except ImportError:
+        if "pillow" not in _warned:
+            _warned.add("pillow")
+            print("Warning: Pillow not installed. Skipping responsive image variants.")
+        return []
+
+    available = []
+    for fmt in formats:
+        if fmt in VARIANT_ENCODERS and features.check(fmt):
+            available.append(fmt)
+        elif fmt not in _warned:
+            _warned.add(fmt)
+            print(f"Warning: {fmt} encoding not available. Skipping {fmt} variants.")
+    return available
+
+
+def encode_variants(
+    path: str, widths: Sequence[int], formats: Sequence[str]
+) -> Tuple[Tuple[int, int], List[Dict[str, Any]]]:
+    """
+    Write resized copies of the image at path next to it (runs in a worker process).
+
+    Widths at or above the original's are replaced by the original width, so
+    images are never upscaled. Files are named {stem}-{width}w.{format};
+    ones that already exist are kept, since image names are content hashes.
+
+    Returns:
+        (original width, height), and one dict per file: path, format, width, height
+    """
+    from PIL import Image
+
+    stem = os.path.splitext(path)[0]
+    variants = []
+    with Image.open(path) as original:
+        size = original.size
+        image = None
+        for width in sorted({min(width, size[0]) for width in widths}):
+            height = max(1, round(size[1] * width / size[0]))
+            resized = None
+            for fmt in formats:
+                variant_path = f"{stem}-{width}w.{fmt}"
+                variants.append({"path": variant_path, "format": fmt, "width": width, "height": height})
+                if os.path.exists(variant_path):
+                    continue
+                if image is None:
+                    image = original.convert("RGB")
+                if resized is None:
+                    resized = image if width == size[0] else image.resize((width, height), Image.LANCZOS)
+                # Renamed into place, so an interrupted encode never leaves a partial file
+                pillow_format, options = VARIANT_ENCODERS[fmt]
+                resized.save(f"{variant_path}.tmp", pillow_format, **options)
+                os.replace(f"{variant_path}.tmp", variant_path)
+    return size, variants
+
+
+async def create_variants(
+    path: str,
+    url: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    max_workers: int = 0,
+) -> Tuple[Optional[Tuple[int, int]], List[ImageVariant]]:
+    """
+    Encode the variants of one image in the process pool.
+
+    Args:
+        path: Original image file
+        url: Public URL of the original; variant URLs share its directory
+        widths: Target widths in pixels
+        formats: Formats to encode ("avif", "webp")
+        max_workers: Pool size if the pool is not running yet (0 = one per CPU)
+
+    Returns:
+        (original width, height), or None when nothing was encoded, and the
+        variants with public URLs, smallest width first
+    """
+    formats = supported_formats(formats)
+    if not formats or not widths:
+        return None, []
+
+    # Workers don't share this process's working directory changes
+    loop = asyncio.get_running_loop()
+    size, encoded = await loop.run_in_executor(
+        get_pool(max_workers), encode_variants, os.path.abspath(path), list(widths), formats
+    )
+    image_dir = os.path.dirname(path)
+    url_dir = url.rsplit("/", 1)[0] if "/" in url else ""
+    return size, [
+        ImageVariant(
+            url=f"{url_dir}/{os.path.basename(variant['path'])}",
+            path=os.path.join(image_dir, os.path.basename(variant["path"])),
+            format=variant["format"],
+            width=variant["width"],
+            height=variant["height"],
+            bytes=os.path.getsize(variant["path"]),
+        )
+        for variant in encoded
+    ]
+
+
+def build_srcset(variants: Sequence[ImageVariant]) -> Dict[str, str]:
+    """srcset attribute value per format, e.g. {"webp": "/images/a-480w.webp 480w, ..."}"""
+    srcset: Dict[str, List[str]] = {}
+    for variant in sorted(variants, key=lambda v: v["width"]):
+        srcset.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+    return {fmt: ", ".join(entries) for fmt, entries in srcset.items()}
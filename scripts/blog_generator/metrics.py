@@ -0,0 +1,346 @@
+"""
+Metrics - Per-stage and per-call latency, token usage, bytes and cost
+
+Records are emitted as JSONL, one object per line:
+    {"type": "stage", "run": ..., "stage": "write", "duration_ms": ...}
+    {"type": "call", "run": ..., "stage": "write", "provider": "anthropic",
+     "operation": "messages.create", "input_tokens": ..., "cost_usd": ...}
+
+The active recorder, run label and stage are held in context variables so
+every outbound call made inside a stage is attributed to it, including
+calls made from concurrent asyncio tasks.
+"""
+
+import os
+import json
+import time
+import contextvars
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+
+# USD per million tokens: (input, output, cache write, cache read)
+ANTHROPIC_PRICING = {
+    "claude-opus-4": (15.00, 75.00, 18.75, 1.50),
+    "claude-sonnet-4": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-7-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-5-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-haiku-4": (1.00, 5.00, 1.25, 0.10),
+    "claude-3-5-haiku": (0.80, 4.00, 1.00, 0.08),
+}
+
+# Tavily bills per API credit; an advanced search costs 2 credits
+TAVILY_COST_PER_CREDIT = 0.008
+TAVILY_CREDITS = {"basic": 1, "advanced": 2}
+
+# USD per generated image
+IMAGEN_PRICING = {
+    "imagen-3.0-generate-002": 0.04,
+}
+
+
+_recorder: contextvars.ContextVar[Optional["MetricsRecorder"]] = contextvars.ContextVar(
+    "metrics_recorder", default=None
+)
+_run: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_run", default="")
+_stage: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_stage", default="")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def anthropic_cost(model: str, input_tokens: int, output_tokens: int,
+                   cache_creation_tokens: int = 0, cache_read_tokens: int = 0) -> float:
+    """Estimate the USD cost of a Claude call from its token usage"""
+    for prefix, (inp, out, write, read) in ANTHROPIC_PRICING.items():
+        if model.startswith(prefix):
+            return (
+                input_tokens * inp
+                + output_tokens * out
+                + cache_creation_tokens * write
+                + cache_read_tokens * read
+            ) / 1_000_000
+    return 0.0
+
+
+class CallMetrics:
+    """Measurements for a single outbound call, filled in by the caller"""
+
+    def __init__(self, provider: str, operation: str, model: str = ""):
+        self.provider = provider
+        self.operation = operation
+        self.model = model
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_creation_input_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.cost_usd = 0.0
+        self.extra: Dict[str, Any] = {}
+
+    def record_message(self, response: Any, request: Any = None):
+        """Record token usage, bytes and cost from an Anthropic Messages response"""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.input_tokens = getattr(usage, "input_tokens", 0) or 0
+            self.output_tokens = getattr(usage, "output_tokens", 0) or 0
+            self.cache_creation_input_tokens = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            self.cache_read_input_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+
+        if request is not None:
+            self.bytes_sent = len(json.dumps(request, default=str).encode("utf-8"))
+        self.bytes_received = sum(
+            len(getattr(block, "text", "").encode("utf-8"))
+            for block in getattr(response, "content", []) or []
+        )
+        self.cost_usd = anthropic_cost(
+            self.model,
+            self.input_tokens,
+            self.output_tokens,
+            self.cache_creation_input_tokens,
+            self.cache_read_input_tokens,
+        )
+
+    def record_search(self, response: Dict[str, Any], request: Dict[str, Any]):
+        """Record bytes and credit cost of a Tavily search"""
+        self.bytes_sent = len(json.dumps(request).encode("utf-8"))
+        self.bytes_received = len(json.dumps(response).encode("utf-8"))
+        credits = TAVILY_CREDITS.get(request.get("search_depth", "basic"), 1)
+        self.cost_usd = credits * TAVILY_COST_PER_CREDIT
+        self.extra["results"] = len(response.get("results", []))
+
+    def record_images(self, images: List[bytes]):
+        """Record bytes and per-image cost of an Imagen call"""
+        self.bytes_received = sum(len(data) for data in images)
+        self.cost_usd = len(images) * IMAGEN_PRICING.get(self.model, 0.0)
+        self.extra["images"] = len(images)
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {
+            "provider": self.provider,
+            "operation": self.operation,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+        record.update(self.extra)
+        return record
+
+
+class MetricsRecorder:
+    """Collects metric records in memory and optionally appends them to a JSONL file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.records: List[Dict[str, Any]] = []
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def emit(self, record: Dict[str, Any]):
+        """Store a record and append it to the JSONL file"""
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate records by stage and by provider operation"""
+        stages: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        calls: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "count": 0, "errors": 0, "retries": 0, "total_ms": 0.0,
+            "input_tokens": 0, "output_tokens": 0,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0,
+            "bytes_sent": 0, "bytes_received": 0, "cost_usd": 0.0,
+            "cache_hits": 0, "cache_misses": 0,
+        })
+        prompts: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"count": 0, "total": 0, "max": 0, "fields": defaultdict(int)})
+        warnings: Dict[str, Dict[str, Any]] = {}
+        runs = []
+
+        for record in self.records:
+            if record["type"] == "stage":
+                entry = stages[record["stage"]]
+                entry["count"] += 1
+                entry["total_ms"] += record["duration_ms"]
+                entry["max_ms"] = max(entry["max_ms"], record["duration_ms"])
+            elif record["type"] == "call":
+                entry = calls[f"{record['provider']}.{record['operation']}"]
+                entry["count"] += 1
+                entry["errors"] += record["status"] != "ok"
+                entry["total_ms"] += record["duration_ms"]
+                for key in ("retries", "input_tokens", "output_tokens",
+                            "cache_creation_input_tokens", "cache_read_input_tokens",
+                            "bytes_sent", "bytes_received", "cost_usd"):
+                    entry[key] += record.get(key, 0)
+                entry["cache_hits"] += record.get("cache") == "hit"
+                entry["cache_misses"] += record.get("cache") == "miss"
+            elif record["type"] == "prompt":
+                entry = prompts[record["template"]]
+                entry["count"] += 1
+                entry["total"] += record["total"]
+                entry["max"] = max(entry["max"], record["total"])
+                for field, tokens in record["fields"].items():
+                    entry["fields"][field] += tokens
+            elif record["type"] == "run":
+                runs.append(record)
+            elif record["type"] == "warning":
+                entry = warnings.setdefault(record["code"], {"count": 0, "message": record["message"]})
+                entry["count"] += 1
+
+        return {
+            "runs": len(runs),
+            "stages": dict(stages),
+            "calls": dict(calls),
+            "prompts": {name: {**entry, "fields": dict(entry["fields"])} for name, entry in prompts.items()},
+            "warnings": warnings,
+            "total_cost_usd": round(sum(c["cost_usd"] for c in calls.values()), 4),
+        }
+
+    def format_summary(self) -> str:
+        """Render the summary as a plain-text table"""
+        summary = self.summary()
+        lines = [f"{'STAGE':<16}{'RUNS':>6}{'AVG s':>10}{'MAX s':>10}"]
+        for name, entry in summary["stages"].items():
+            lines.append(
+                f"{name:<16}{entry['count']:>6}"
+                f"{entry['total_ms'] / entry['count'] / 1000:>10.1f}"
+                f"{entry['max_ms'] / 1000:>10.1f}"
+            )
+
+        lines.append("")
+        lines.append(
+            f"{'CALL':<30}{'N':>5}{'ERR':>5}{'RETRY':>6}{'AVG s':>8}"
+            f"{'IN TOK':>10}{'OUT TOK':>9}{'CACHE RD':>10}{'CACHE WR':>10}{'KB':>9}{'USD':>9}"
+        )
+        for name, entry in summary["calls"].items():
+            kb = (entry["bytes_sent"] + entry["bytes_received"]) / 1024
+            lines.append(
+                f"{name:<30}{entry['count']:>5}{entry['errors']:>5}{entry['retries']:>6}"
+                f"{entry['total_ms'] / entry['count'] / 1000:>8.1f}"
+                f"{entry['input_tokens']:>10}{entry['output_tokens']:>9}"
+                f"{entry['cache_read_input_tokens']:>10}{entry['cache_creation_input_tokens']:>10}"
+                f"{kb:>9.1f}{entry['cost_usd']:>9.3f}"
+            )
+
+        if summary["prompts"]:
+            lines.append("")
+            lines.append(f"{'PROMPT':<18}{'N':>5}{'AVG TOK':>9}{'MAX TOK':>9}  LARGEST FIELDS (avg tokens)")
+            for name, entry in summary["prompts"].items():
+                count = entry["count"]
+                largest = sorted(entry["fields"].items(), key=lambda item: -item[1])[:3]
+                lines.append(
+                    f"{name:<18}{count:>5}{entry['total'] // count:>9}{entry['max']:>9}  "
+                    + ", ".join(f"{field}={tokens // count}" for field, tokens in largest)
+                )
+
+        hits = sum(c["cache_hits"] for c in summary["calls"].values())
+        misses = sum(c["cache_misses"] for c in summary["calls"].values())
+        if hits or misses:
+            lines.append("")
+            lines.append(f"Response cache: {hits} hits, {misses} misses")
+
+        if summary["warnings"]:
+            lines.append("")
+            for code, entry in summary["warnings"].items():
+                lines.append(f"Warning ({code}, x{entry['count']}): {entry['message']}")
+
+        lines.append("")
+        lines.append(f"Estimated cost: ${summary['total_cost_usd']:.3f}")
+        return "\n".join(lines)
+
+
+def use_recorder(recorder: Optional[MetricsRecorder], run: str = "") -> None:
+    """Make recorder active for the current context (e.g. one generation run)"""
+    _recorder.set(recorder)
+    _run.set(run)
+
+
+def emit(record: Dict[str, Any]):
+    """Emit a record to the active recorder, tagged with the current run and stage"""
+    recorder = _recorder.get()
+    if recorder is None:
+        return
+    record.setdefault("run", _run.get())
+    record.setdefault("stage", _stage.get())
+    recorder.emit(record)
+
+
+def warn(code: str, message: str, **fields):
+    """Print a warning and record it, so it also shows in the metrics summary"""
+    print(f"Warning: {message}")
+    emit({"type": "warning", "code": code, "message": message, **fields})
+
+
+@contextmanager
+def _timed(record_type: str, **fields):
+    start_wall = _now()
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        emit({
+            "type": record_type,
+            **fields,
+            "start": start_wall,
+            "end": _now(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "status": status,
+            "error": error,
+        })
+
+
+@asynccontextmanager
+async def track_stage(name: str):
+    """Time a pipeline stage and attribute calls made inside it to the stage"""
+    token = _stage.set(name)
+    try:
+        with _timed("stage", stage=name):
+            yield
+    finally:
+        _stage.reset(token)
+
+
+@asynccontextmanager
+async def track_call(provider: str, operation: str, model: str = ""):
+    """
+    Time an outbound call. The caller fills in the yielded CallMetrics.
+
+    Example:
+        async with track_call("anthropic", "messages.create", model) as call:
+            response = await client.messages.create(**request)
+            call.record_message(response, request)
+    """
+    call = CallMetrics(provider, operation, model)
+    start_wall = _now()
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield call
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        emit({
+            "type": "call",
+            **call.to_record(),
+            "start": start_wall,
+            "end": _now(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "status": status,
+            "error": error,
+        })
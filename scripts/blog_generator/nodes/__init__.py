@@ -1,19 +1,32 @@
 """
-LangGraph nodes for blog generation pipeline
+Pipeline nodes for blog generation (the stages PipelineGraph runs)
+
+Each node has an async implementation (a*_node) and a synchronous wrapper.
 """
 
-from .planner import plan_node
-from .research import research_node
-from .writer import writer_node
-from .images import images_node
-from .seo import seo_node
-from .output import output_node
+from .planner import plan_node, aplan_node
+from .research import research_node, aresearch_node
+from .rank import rank_node, arank_node
+from .writer import writer_node, awriter_node
+from .images import image_prompts_node, aimage_prompts_node, images_node, aimages_node
+from .seo import seo_node, aseo_node
+from .output import output_node, aoutput_node
 
 __all__ = [
     "plan_node",
+    "aplan_node",
     "research_node",
+    "aresearch_node",
+    "rank_node",
+    "arank_node",
     "writer_node",
+    "awriter_node",
+    "image_prompts_node",
+    "aimage_prompts_node",
     "images_node",
+    "aimages_node",
     "seo_node",
+    "aseo_node",
     "output_node",
+    "aoutput_node",
 ]
@@ -3,12 +3,24 @@ Images Node - AI image generation using Google Gemini/Imagen
 """
 
 import os
-import anthropic
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..state import BlogState, ImagePrompt, GeneratedImage
-from ..config import SiteConfig, APIConfig
+from ..config import SiteConfig, APIConfig, OutputFormat
+from ..clients import ClientRegistry, borrow_clients
+from ..image_store import ImageStore
+from ..metrics import track_call
+from ..imaging import build_srcset, create_variants
+from ..prompts import Field, build_prompt
+from .output import aupload_image_to_ghost
+from .seo import slugify
+
+
+IMAGEN_MODEL = "imagen-3.0-generate-002"
+MAX_IMAGES_PER_REQUEST = 4  # Imagen's number_of_images limit
+
+CONTENT_SUMMARY_TOKENS = 500  # Start of the article shown to the model
 
 
 IMAGE_PROMPTS_TEMPLATE = """Create {count} image prompts for this blog post.
@@ -44,137 +56,293 @@ IMAGE 2:
 """
 
 
-def generate_image_prompts(
+# Field lines inside an "IMAGE n:" block
+_IMAGE_PROMPT_KEYS = {"Prompt": "prompt", "Alt": "alt", "Filename": "filename", "Aspect": "aspect"}
+
+
+def parse_image_prompts(text: str) -> List[ImagePrompt]:
+    """Extract the IMAGE blocks from the image prompts response (blocks without a prompt are skipped)"""
+    prompts: List[ImagePrompt] = []
+    current: Dict[str, str] = {}
+
+    def finish_block():
+        if current.get("prompt"):
+            prompts.append(ImagePrompt(
+                prompt=current["prompt"],
+                alt_text=current.get("alt", ""),
+                filename=current.get("filename", f"image-{len(prompts)+1}"),
+                aspect_ratio=current.get("aspect", "16:9"),
+            ))
+        current.clear()
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("IMAGE"):
+            finish_block()
+            continue
+        name, sep, value = line.partition(":")
+        key = _IMAGE_PROMPT_KEYS.get(name) if sep else None
+        if key:
+            current[key] = value.strip()
+    finish_block()
+    return prompts
+
+
+async def generate_image_prompts(
     state: BlogState,
     site_config: SiteConfig,
     api_config: APIConfig,
-    count: int = 3
+    count: int = 3,
+    clients: Optional[ClientRegistry] = None,
 ) -> List[ImagePrompt]:
     """Generate image prompts using Claude"""
-    client = anthropic.Anthropic(api_key=api_config.anthropic_api_key)
 
     # Summarize content for image context
     content = state.get("full_content", state.get("plan", state["topic"]))
-    content_summary = content[:2000]  # First 2000 chars
-
-    prompt = IMAGE_PROMPTS_TEMPLATE.format(
+    prompt, _ = build_prompt(
+        "image_prompts",
+        IMAGE_PROMPTS_TEMPLATE,
         count=count,
         title=state.get("title", state["topic"]),
         topic=state["topic"],
-        content_summary=content_summary,
+        content_summary=Field(content, CONTENT_SUMMARY_TOKENS),
         site_name=site_config.name,
     )
 
-    response = client.messages.create(
-        model=api_config.claude_model,
-        max_tokens=2000,
-        temperature=0.5,
-        messages=[{"role": "user", "content": prompt}],
-    )
-
-    # Parse response into ImagePrompts
-    prompts = []
-    current_prompt = {}
-
-    for line in response.content[0].text.split("\n"):
-        line = line.strip()
-        if line.startswith("IMAGE"):
-            if current_prompt.get("prompt"):
-                prompts.append(ImagePrompt(
-                    prompt=current_prompt.get("prompt", ""),
-                    alt_text=current_prompt.get("alt", ""),
-                    filename=current_prompt.get("filename", f"image-{len(prompts)+1}"),
-                    aspect_ratio=current_prompt.get("aspect", "16:9"),
-                ))
-            current_prompt = {}
-        elif line.startswith("Prompt:"):
-            current_prompt["prompt"] = line.replace("Prompt:", "").strip()
-        elif line.startswith("Alt:"):
-            current_prompt["alt"] = line.replace("Alt:", "").strip()
-        elif line.startswith("Filename:"):
-            current_prompt["filename"] = line.replace("Filename:", "").strip()
-        elif line.startswith("Aspect:"):
-            current_prompt["aspect"] = line.replace("Aspect:", "").strip()
-
-    # Don't forget the last one
-    if current_prompt.get("prompt"):
-        prompts.append(ImagePrompt(
-            prompt=current_prompt.get("prompt", ""),
-            alt_text=current_prompt.get("alt", ""),
-            filename=current_prompt.get("filename", f"image-{len(prompts)+1}"),
-            aspect_ratio=current_prompt.get("aspect", "16:9"),
-        ))
+    async with borrow_clients(clients, api_config) as clients:
+        response = await clients.create_message(
+            model=api_config.claude_model,
+            max_tokens=2000,
+            temperature=0.5,
+            messages=[{"role": "user", "content": prompt}],
+        )
 
+    prompts = parse_image_prompts(response.content[0].text)
     return prompts[:count]
 
 
-def generate_images_with_gemini(
+async def generate_images_with_gemini(
     prompts: List[ImagePrompt],
     output_dir: str,
     api_config: APIConfig,
     slug: str,
+    clients: Optional[ClientRegistry] = None,
+    responsive: bool = False,
+    ghost_site: Optional[SiteConfig] = None,
 ) -> List[GeneratedImage]:
-    """Generate images using Google Gemini API"""
+    """
+    Generate images using Google Gemini API (with WebP/AVIF variants if
+    responsive, and uploaded to ghost_site if given)
+    """
     try:
-        from google import genai
-        from google.genai import types
+        from google import genai  # noqa: F401
     except ImportError:
         print("Warning: google-genai not installed. Skipping image generation.")
         return []
 
-    generated = []
+    async with borrow_clients(clients, api_config) as clients:
+        try:
+            clients.genai
+        except Exception as e:
+            print(f"Error initializing Gemini client: {e}")
+            return []
 
-    try:
-        client = genai.Client(
-            vertexai=True,
-            project=api_config.google_project_id,
-            location="global",  # Required for Gemini image generation
-        )
-    except Exception as e:
-        print(f"Error initializing Gemini client: {e}")
-        return []
+        return await _generate_images(clients, prompts, output_dir, slug, responsive, ghost_site)
+
+
+def usable_samples(generated_images: List[Any]) -> List[bytes]:
+    """
+    Image bytes from one Imagen response, in the order returned.
 
+    Safety-filtered samples (no bytes) are dropped, so spare candidates stand
+    in for filtered ones. Imagen returns no quality score, so nothing else is
+    ranked: the first usable sample is kept.
+    """
+    return [
+        image.image.image_bytes
+        for image in generated_images or []
+        if image.image and image.image.image_bytes
+    ]
+
+
+async def _generate_images(
+    clients: ClientRegistry,
+    prompts: List[ImagePrompt],
+    output_dir: str,
+    slug: str,
+    responsive: bool = False,
+    ghost_site: Optional[SiteConfig] = None,
+) -> List[GeneratedImage]:
+    """
+    Generate one image per prompt, up to api_config.image_concurrency calls at a time.
+
+    Prompts whose image is already in the image store are served from it.
+    The rest get one call each (a generate_images call takes a single prompt),
+    asking for api_config.image_candidates samples, and each image is stored
+    as soon as its call returns. While other calls are still in
+    flight, its variants are then encoded in the imaging process pool (if
+    responsive) or it is uploaded to ghost_site, whose URL replaces the
+    local one. Prompts that fail or time out are skipped; the others are
+    returned in prompt order.
+    """
+    from google.genai import types
+
+    api_config = clients.api_config
+    semaphore = asyncio.Semaphore(max(1, api_config.image_concurrency))
+    store = clients.image_store(output_dir)
     os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    for i, prompt_data in enumerate(prompts):
-        try:
-            # Generate image
-            response = client.models.generate_images(
-                model="imagen-3.0-generate-002",
-                prompt=prompt_data["prompt"],
-                config=types.GenerateImagesConfig(
-                    number_of_images=1,
-                    aspect_ratio=prompt_data["aspect_ratio"].replace(":", ":"),
-                    safety_filter_level="BLOCK_MEDIUM_AND_ABOVE",
+    async def save(i: int, filename: str) -> GeneratedImage:
+        image = GeneratedImage(
+            path=os.path.join(output_dir, filename),
+            alt_text=prompts[i]["alt_text"],
+            aspect_ratio=prompts[i]["aspect_ratio"],
+            url=f"/images/{filename}",
+        )
+        if responsive:
+            await _add_variants(image, api_config)
+        if ghost_site:
+            await _upload_to_ghost(image, ghost_site, clients)
+        return image
+
+    async def reuse(i: int, filename: str) -> List[Tuple[int, GeneratedImage]]:
+        # Recorded like a cached response: a call that cost nothing
+        async with track_call("imagen", "generate_images", IMAGEN_MODEL) as call:
+            call.extra["cache"] = "hit"
+        print(f"Reused image: {filename}")
+        return [(i, await save(i, filename))]
+
+    keys = _prompt_keys(prompts)
+    stored = {i: store.lookup(key) for i, key in enumerate(keys)}
+    pending = [i for i, filename in stored.items() if filename is None]
+
+    # Spare samples for the safety filter; every sample is billed
+    candidates = min(max(1, api_config.image_candidates), MAX_IMAGES_PER_REQUEST)
+
+    async def generate(i: int) -> List[Tuple[int, GeneratedImage]]:
+        prompt_data = prompts[i]
+        async with semaphore:
+            # The timeout covers rate-limit waits and retries for this call
+            response = await asyncio.wait_for(
+                clients.generate_images(
+                    model=IMAGEN_MODEL,
+                    prompt=prompt_data["prompt"],
+                    config=types.GenerateImagesConfig(
+                        number_of_images=candidates,
+                        aspect_ratio=prompt_data["aspect_ratio"],
+                        safety_filter_level="BLOCK_MEDIUM_AND_ABOVE",
+                    ),
                 ),
+                api_config.image_timeout,
             )
 
-            if response.generated_images:
-                # Save image
-                filename = f"{slug}-{i+1}-{timestamp}.jpg"
-                filepath = os.path.join(output_dir, filename)
+        samples = usable_samples(response.generated_images)
+        if not samples:
+            raise ValueError("every sample was blocked by the safety filter")
+        # Named by content hash, so the same image always gets the same immutable URL
+        filename = await store.put(samples[0], slug, keys[i])
+        print(f"Generated image: {filename}")
+        return [(i, await save(i, filename))]
+
+    jobs = [([i], generate(i)) for i in pending]
+    jobs += [([i], reuse(i, filename)) for i, filename in stored.items() if filename is not None]
+    results = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+    by_position: Dict[int, GeneratedImage] = {}
+    for (positions, _), result in zip(jobs, results):
+        positions = ", ".join(str(i + 1) for i in positions)
+        if isinstance(result, asyncio.TimeoutError):
+            print(f"Error generating image {positions}: timed out after {api_config.image_timeout:g}s")
+        elif isinstance(result, Exception):
+            print(f"Error generating image {positions}: {result}")
+        else:
+            by_position.update(result)
+
+    return [by_position[i] for i in sorted(by_position)]
+
+
+def _prompt_keys(prompts: List[ImagePrompt]) -> List[str]:
+    """Image store key per prompt position; repeats of a prompt get increasing sample numbers"""
+    seen: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for prompt_data in prompts:
+        group = (" ".join(prompt_data["prompt"].lower().split()), prompt_data["aspect_ratio"])
+        sample = seen.get(group, 0)
+        seen[group] = sample + 1
+        keys.append(ImageStore.prompt_key(prompt_data["prompt"], IMAGEN_MODEL, prompt_data["aspect_ratio"], sample))
+    return keys
+
+
+async def _add_variants(image: GeneratedImage, api_config: APIConfig):
+    """Encode an image's WebP/AVIF variants and record them with its size and srcsets"""
+    try:
+        size, variants = await create_variants(
+            image["path"],
+            image["url"],
+            api_config.image_variant_widths,
+            api_config.image_variant_formats,
+            api_config.image_workers,
+        )
+    except Exception as e:
+        # The original is still usable without variants
+        print(f"Error creating variants of {os.path.basename(image['path'])}: {e}")
+        return
 
-                image_bytes = response.generated_images[0].image.image_bytes
-                with open(filepath, "wb") as f:
-                    f.write(image_bytes)
+    if size:
+        image["width"], image["height"] = size
+        image["variants"] = variants
+        image["srcset"] = build_srcset(variants)
 
-                generated.append(GeneratedImage(
-                    path=filepath,
-                    alt_text=prompt_data["alt_text"],
-                    aspect_ratio=prompt_data["aspect_ratio"],
-                    url=f"/images/{filename}",
-                ))
-                print(f"Generated image: {filename}")
 
-        except Exception as e:
-            print(f"Error generating image {i+1}: {e}")
-            continue
+async def _upload_to_ghost(image: GeneratedImage, site_config: SiteConfig, clients: ClientRegistry):
+    """Replace an image's local URL with the one Ghost serves it from"""
+    try:
+        image["url"] = await aupload_image_to_ghost(image["path"], site_config, clients)
+    except Exception as e:
+        # Left local; the post is published without this image
+        print(f"Error uploading {os.path.basename(image['path'])} to Ghost: {e}")
+        return
+    print(f"Uploaded image: {image['url']}")
 
-    return generated
 
+async def aimage_prompts_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
+    """
+    Generate image prompts for the blog post.
 
-def images_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    Only needs the written content, so it can run alongside the SEO node.
+
+    Args:
+        state: Current blog state
+        site_config: Site-specific configuration
+        api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
+
+    Returns:
+        Updated state with image_prompts
+    """
+    if state["target_image_count"] <= 0:
+        return {"image_prompts": []}
+
+    return {
+        "image_prompts": await generate_image_prompts(
+            state, site_config, api_config,
+            count=state["target_image_count"],
+            clients=clients,
+        ),
+    }
+
+
+async def aimages_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Generate AI images for the blog post.
 
@@ -182,6 +350,7 @@ def images_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
         state: Current blog state
         site_config: Site-specific configuration
         api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Updated state with image_prompts, generated_images, featured_image
@@ -194,25 +363,32 @@ def images_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
             "featured_image": None,
         }
 
-    # Generate prompts
-    image_prompts = generate_image_prompts(
+    # Reuse prompts from image_prompts_node, otherwise generate them here
+    image_prompts = state.get("image_prompts") or await generate_image_prompts(
         state, site_config, api_config,
-        count=state["target_image_count"]
+        count=state["target_image_count"],
+        clients=clients,
     )
 
     # Create slug for filenames
-    slug = state.get("slug", "")
-    if not slug:
-        slug = state.get("title", state["topic"]).lower()
-        slug = "".join(c if c.isalnum() or c == "-" else "-" for c in slug)
-        slug = "-".join(filter(None, slug.split("-")))[:50]
+    slug = state.get("slug", "") or slugify(state.get("title", state["topic"]), max_length=50)
+
+    # Ghost sites upload each image as it is generated, before the post is created
+    ghost = site_config.output_format == OutputFormat.GHOST
+    upload = ghost and bool(site_config.ghost_api_url and site_config.ghost_admin_key)
+    if ghost and not upload:
+        print("Warning: Ghost API URL or admin key not configured. Images will not be uploaded.")
 
     # Generate images
-    generated_images = generate_images_with_gemini(
+    generated_images = await generate_images_with_gemini(
         prompts=image_prompts,
         output_dir=site_config.images_dir,
         api_config=api_config,
         slug=slug,
+        clients=clients,
+        # Ghost resizes and converts uploaded images itself
+        responsive=not ghost,
+        ghost_site=site_config if upload else None,
     )
 
     # Set featured image
@@ -226,3 +402,13 @@ def images_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
         "featured_image": featured_image,
         "slug": slug,
     }
+
+
+def image_prompts_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aimage_prompts_node"""
+    return asyncio.run(aimage_prompts_node(state, site_config, api_config))
+
+
+def images_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aimages_node"""
+    return asyncio.run(aimages_node(state, site_config, api_config))
@@ -3,15 +3,19 @@ Output Node - Format and save blog posts
 """
 
 import os
+import html
 import json
-import requests
+import asyncio
+import httpx
 import jwt
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-from ..state import BlogState
+from ..state import BlogState, GeneratedImage
 from ..config import SiteConfig, OutputFormat
+from ..clients import ClientRegistry, borrow_clients
+from ..image_store import image_format
 
 
 def generate_mdx_output(state: BlogState, site_config: SiteConfig) -> str:
@@ -22,20 +26,28 @@ def generate_mdx_output(state: BlogState, site_config: SiteConfig) -> str:
     if not tags:
         tags = site_config.default_tags
 
-    # Get featured image
+    # Get featured image, with its size and srcsets when variants were made
     featured_image = state.get("featured_image", "/images/blog-default.jpg")
+    image_details = ""
     if state.get("generated_images"):
-        featured_image = state["generated_images"][0].get("url", featured_image)
+        image = state["generated_images"][0]
+        featured_image = image.get("url", featured_image)
+        image_details = _image_frontmatter(image)
+
+    # Escape quotes outside the f-string (backslashes in f-string
+    # expressions are a syntax error before Python 3.12)
+    title = state["title"].replace('"', '\\"')
+    description = state.get("meta_description", "").replace('"', '\\"')
 
     # Build frontmatter
     frontmatter = f'''---
-title: "{state['title'].replace('"', '\\"')}"
-description: "{state.get('meta_description', '').replace('"', '\\"')}"
+title: "{title}"
+description: "{description}"
 date: "{datetime.now().strftime('%Y-%m-%d')}"
 author: "{site_config.author}"
 tags: {json.dumps(tags)}
 image: "{featured_image}"
-readingTime: "{state.get('reading_time', '5 min read')}"
+{image_details}readingTime: "{state.get('reading_time', '5 min read')}"
 ---
 
 '''
@@ -50,6 +62,18 @@ readingTime: "{state.get('reading_time', '5 min read')}"
     return frontmatter + content
 
 
+def _image_frontmatter(image: Dict[str, Any]) -> str:
+    """imageWidth/imageHeight and imageSrcset (per format) lines for a generated image"""
+    lines = []
+    if image.get("width"):
+        lines.append(f"imageWidth: {image['width']}")
+        lines.append(f"imageHeight: {image['height']}")
+    if image.get("srcset"):
+        lines.append("imageSrcset:")
+        lines.extend(f'  {fmt}: "{srcset}"' for fmt, srcset in image["srcset"].items())
+    return "".join(f"{line}\n" for line in lines)
+
+
 def save_mdx_file(content: str, slug: str, output_dir: str) -> str:
     """Save MDX content to file"""
     os.makedirs(output_dir, exist_ok=True)
@@ -90,7 +114,68 @@ def generate_ghost_admin_token(admin_key: str) -> str:
     return token
 
 
-def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
+async def aupload_image_to_ghost(
+    path: str,
+    site_config: SiteConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> str:
+    """
+    Upload an image file to Ghost via the Admin API, streamed from disk.
+
+    Returns:
+        The URL Ghost serves the image from
+
+    Raises:
+        ValueError: If the admin key is malformed
+        httpx.HTTPError: If the upload fails after retries
+    """
+    token = generate_ghost_admin_token(site_config.ghost_admin_key)
+    api_url = f"{site_config.ghost_api_url.rstrip('/')}/ghost/api/admin/images/upload/"
+    # Sniffed from the bytes: images stored by earlier versions are all named .jpg
+    with open(path, "rb") as f:
+        content_type = image_format(f.read(16))[1]
+
+    async with borrow_clients(clients) as clients:
+        response = await clients.upload_file(
+            "ghost", "images.upload", api_url, path,
+            content_type=content_type,
+            data={"purpose": "image", "ref": os.path.basename(path)},
+            headers={"Authorization": f"Ghost {token}"},
+        )
+    return response.json()["images"][0]["url"]
+
+
+def insert_inline_images(content: str, images: List[GeneratedImage]) -> str:
+    """
+    Place images before evenly spaced "## " sections of the content.
+
+    Only images with an absolute URL (e.g. uploaded to Ghost) are used, at
+    most one per section.
+    """
+    images = [image for image in images if (image.get("url") or "").startswith(("http://", "https://"))]
+    lines = content.split("\n")
+    headings = [i for i, line in enumerate(lines) if line.startswith("## ")]
+    images = images[:len(headings)]
+    if not images:
+        return content
+
+    step = len(headings) / (len(images) + 1)
+    placements = {headings[min(len(headings) - 1, int(step * (k + 1)))]: image for k, image in enumerate(images)}
+    for index in sorted(placements, reverse=True):
+        image = placements[index]
+        size = f' width="{image["width"]}" height="{image["height"]}"' if image.get("width") else ""
+        lines.insert(index, (
+            f'<figure class="kg-card kg-image-card"><img src="{html.escape(image["url"])}" '
+            f'alt="{html.escape(image.get("alt_text", ""))}"{size} loading="lazy"></figure>\n'
+        ))
+    return "\n".join(lines)
+
+
+async def apublish_to_ghost(
+    state: BlogState,
+    site_config: SiteConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """Publish blog post to Ghost CMS via Admin API"""
 
     if not site_config.ghost_api_url or not site_config.ghost_admin_key:
@@ -112,6 +197,9 @@ def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any
     if content.startswith(f"# {state['title']}"):
         content = content[len(f"# {state['title']}"):].strip()
 
+    # The first image is the feature image; the rest go between sections
+    content = insert_inline_images(content, state.get("generated_images", [])[1:])
+
     post_data = {
         "posts": [{
             "title": state["title"],
@@ -124,8 +212,8 @@ def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any
         }]
     }
 
-    # Add featured image if available
-    if state.get("featured_image"):
+    # Add featured image if it was uploaded (Ghost can't resolve our local paths)
+    if (state.get("featured_image") or "").startswith(("http://", "https://")):
         post_data["posts"][0]["feature_image"] = state["featured_image"]
 
     # Make API request
@@ -134,11 +222,14 @@ def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any
         "Content-Type": "application/json",
     }
 
-    api_url = f"{site_config.ghost_api_url.rstrip('/')}/ghost/api/admin/posts/"
+    # source=html: Ghost ignores the html field otherwise
+    api_url = f"{site_config.ghost_api_url.rstrip('/')}/ghost/api/admin/posts/?source=html"
 
     try:
-        response = requests.post(api_url, json=post_data, headers=headers)
-        response.raise_for_status()
+        async with borrow_clients(clients) as clients:
+            response = await clients.request(
+                "ghost", "posts.create", "POST", api_url, json=post_data, headers=headers
+            )
         result = response.json()
         return {
             "success": True,
@@ -146,17 +237,22 @@ def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any
             "slug": result["posts"][0]["slug"],
             "url": f"{site_config.ghost_api_url}/{result['posts'][0]['slug']}/",
         }
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {"error": f"Ghost API error: {e}"}
 
 
-def output_node(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
+async def aoutput_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Format and save the blog post based on output format.
 
     Args:
         state: Current blog state
         site_config: Site-specific configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Result with file path or API response
@@ -176,7 +272,7 @@ def output_node(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
 
     elif site_config.output_format == OutputFormat.GHOST:
         # Publish to Ghost CMS
-        result = publish_to_ghost(state, site_config)
+        result = await apublish_to_ghost(state, site_config, clients)
         result["output_type"] = "ghost"
         return result
 
@@ -195,3 +291,13 @@ def output_node(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
             "slug": state["slug"],
             "success": True,
         }
+
+
+def publish_to_ghost(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around apublish_to_ghost"""
+    return asyncio.run(apublish_to_ghost(state, site_config))
+
+
+def output_node(state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aoutput_node"""
+    return asyncio.run(aoutput_node(state, site_config))
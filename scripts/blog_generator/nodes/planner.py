@@ -2,11 +2,13 @@
 Planner Node - Creates detailed blog outline and structure
 """
 
-import anthropic
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..state import BlogState
 from ..config import SiteConfig, APIConfig
+from ..clients import ClientRegistry, borrow_clients
+from ..prompts import build_prompt
 
 
 PLANNER_PROMPT = """You are an expert content strategist creating a blog post outline.
@@ -73,7 +75,41 @@ def get_target_audience(site_name: str) -> str:
         return "Business owners, IT decision-makers, and professionals seeking technology solutions for their organizations"
 
 
-def plan_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+def parse_plan(plan_text: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Extract the title and section outline from the planner's response.
+
+    Sections are numbered lines ("2. Heading"); "- " lines below a section
+    are its key points. The first "TITLE:" line is the title.
+
+    Returns:
+        (title, sections) where each section is {"title": ..., "key_points": [...]}
+    """
+    title = None
+    sections: List[Dict[str, Any]] = []
+    # One pass, dispatching on the first character of each stripped line
+    for line in plan_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        first = line[0]
+        if first == "-":
+            if sections:
+                sections[-1]["key_points"].append(line[1:].strip())
+        elif first.isdigit():
+            if "." in line:
+                sections.append({"title": line.split(".", 1)[1].strip(), "key_points": []})
+        elif title is None and line.startswith("TITLE:"):
+            title = line[len("TITLE:"):].strip()
+    return title or "", sections
+
+
+async def aplan_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Generate a detailed blog post outline based on the topic.
 
@@ -81,13 +117,14 @@ def plan_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig)
         state: Current blog state
         site_config: Site-specific configuration
         api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Updated state with plan and sections_outline
     """
-    client = anthropic.Anthropic(api_key=api_config.anthropic_api_key)
-
-    prompt = PLANNER_PROMPT.format(
+    prompt, _ = build_prompt(
+        "plan",
+        PLANNER_PROMPT,
         site_name=site_config.name,
         domain=site_config.domain,
         author=site_config.author,
@@ -99,43 +136,24 @@ def plan_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig)
         word_count=state["target_word_count"],
     )
 
-    response = client.messages.create(
-        model=api_config.claude_model,
-        max_tokens=4000,
-        temperature=0.3,
-        messages=[{"role": "user", "content": prompt}],
-    )
+    async with borrow_clients(clients, api_config) as clients:
+        response = await clients.create_message(
+            model=api_config.claude_model,
+            max_tokens=4000,
+            temperature=0.3,
+            messages=[{"role": "user", "content": prompt}],
+        )
 
     plan_text = response.content[0].text
-
-    # Extract title from plan
-    title = ""
-    for line in plan_text.split("\n"):
-        if line.strip().startswith("TITLE:"):
-            title = line.replace("TITLE:", "").strip()
-            break
-
-    # Parse sections (simplified parsing)
-    sections = []
-    current_section = None
-    for line in plan_text.split("\n"):
-        line = line.strip()
-        if line and line[0].isdigit() and "." in line:
-            if current_section:
-                sections.append(current_section)
-            section_title = line.split(".", 1)[1].strip() if "." in line else line
-            current_section = {
-                "title": section_title,
-                "key_points": [],
-            }
-        elif current_section and line.startswith("-"):
-            current_section["key_points"].append(line[1:].strip())
-
-    if current_section:
-        sections.append(current_section)
+    title, sections = parse_plan(plan_text)
 
     return {
         "plan": plan_text,
         "title": title,
         "sections_outline": sections,
     }
+
+
+def plan_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aplan_node"""
+    return asyncio.run(aplan_node(state, site_config, api_config))
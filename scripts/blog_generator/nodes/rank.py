@@ -0,0 +1,59 @@
+"""
+Rank Node - Drop near-duplicate research results and keep the most relevant
+"""
+
+import asyncio
+from typing import Dict, Any, List
+
+from ..state import BlogState
+from ..config import SiteConfig, APIConfig
+from ..retrieval import dedupe, bm25_scores
+
+
+def build_ranking_query(state: BlogState) -> str:
+    """Topic, primary keyword and planner outline as one bag-of-words query"""
+    parts = [state["topic"], state.get("primary_keyword") or ""]
+    for section in state.get("sections_outline", []):
+        parts.append(section["title"])
+        parts.extend(section.get("key_points", []))
+    return "\n".join(parts)
+
+
+async def arank_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """
+    Select the research sources passed to the writer.
+
+    Search errors are dropped, near-duplicates (e.g. syndicated copies of one
+    article) are collapsed, and the remaining results are scored with BM25
+    against the topic, keyword and outline.
+
+    Args:
+        state: Current blog state
+        site_config: Site-specific configuration
+        api_config: API keys configuration
+
+    Returns:
+        Updated state with ranked_research (top api_config.research_top_k sources, best first)
+    """
+    # MinHash and BM25 are CPU-bound; run them off the event loop
+    ranked = await asyncio.to_thread(_rank, state, api_config)
+    return {"ranked_research": ranked}
+
+
+def _rank(state: BlogState, api_config: APIConfig) -> List[str]:
+    """Top api_config.research_top_k research results, deduplicated, best first"""
+    results: List[str] = [
+        item for item in state.get("research_content", [])
+        if not item.startswith("Search error")
+    ]
+    results = [results[i] for i in dedupe(results, threshold=api_config.research_dedupe_threshold)]
+
+    scores = bm25_scores(results, build_ranking_query(state))
+    # Stable sort: ties keep search order
+    order = sorted(range(len(results)), key=lambda i: -scores[i])
+    return [results[i] for i in order[:api_config.research_top_k]]
+
+
+def rank_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around arank_node"""
+    return asyncio.run(arank_node(state, site_config, api_config))
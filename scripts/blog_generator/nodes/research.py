@@ -2,11 +2,30 @@
 Research Node - Web research using Tavily API
 """
 
-from typing import Dict, Any, List
-from tavily import TavilyClient
+import asyncio
+from typing import Dict, Any, List, Optional
 
 from ..state import BlogState
 from ..config import SiteConfig, APIConfig
+from ..clients import ClientRegistry, borrow_clients
+
+
+# Domains searched for research content
+RESEARCH_DOMAINS = [
+    "arxiv.org",
+    "nature.com",
+    "sciencedirect.com",
+    "springer.com",
+    "ieee.org",
+    "acm.org",
+    "medium.com",
+    "techcrunch.com",
+    "wired.com",
+    "forbes.com",
+    "hbr.org",
+    "mckinsey.com",
+    "gartner.com",
+]
 
 
 def create_search_queries(topic: str, site_name: str) -> List[str]:
@@ -34,7 +53,12 @@ def create_search_queries(topic: str, site_name: str) -> List[str]:
     return base_queries[:4]  # Limit to 4 queries
 
 
-def research_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+async def aresearch_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Perform web research using Tavily API.
 
@@ -42,58 +66,65 @@ def research_node(state: BlogState, site_config: SiteConfig, api_config: APIConf
         state: Current blog state
         site_config: Site-specific configuration
         api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Updated state with research_content and academic_sources
     """
-    client = TavilyClient(api_key=api_config.tavily_api_key)
+    async with borrow_clients(clients, api_config) as clients:
+        return await _research(clients, state, site_config)
+
 
+async def _research(clients: ClientRegistry, state: BlogState, site_config: SiteConfig) -> Dict[str, Any]:
+    """Run the search queries concurrently and collect formatted results in query order"""
+    api_config = clients.api_config
     queries = create_search_queries(state["topic"], site_config.name)
+    semaphore = asyncio.Semaphore(max(1, api_config.research_concurrency))
+
+    async def search(query: str) -> Dict[str, Any]:
+        request = {
+            "query": query,
+            "search_depth": "advanced",
+            "max_results": 3,
+            "include_domains": RESEARCH_DOMAINS,
+        }
+        async with semaphore:
+            # The timeout covers rate-limit waits and retries for this query
+            return await asyncio.wait_for(clients.search(**request), api_config.search_timeout)
+
+    responses = await asyncio.gather(*(search(query) for query in queries), return_exceptions=True)
 
     research_content = []
     academic_sources = []
 
-    for query in queries:
-        try:
-            response = client.search(
-                query=query,
-                search_depth="advanced",
-                max_results=3,
-                include_domains=[
-                    "arxiv.org",
-                    "nature.com",
-                    "sciencedirect.com",
-                    "springer.com",
-                    "ieee.org",
-                    "acm.org",
-                    "medium.com",
-                    "techcrunch.com",
-                    "wired.com",
-                    "forbes.com",
-                    "hbr.org",
-                    "mckinsey.com",
-                    "gartner.com",
-                ],
-            )
-
-            for result in response.get("results", []):
-                content = f"Source: {result.get('title', 'Unknown')}\n"
-                content += f"URL: {result.get('url', '')}\n"
-                content += f"Content: {result.get('content', '')}\n"
-                research_content.append(content)
-
-                # Track academic sources
-                url = result.get("url", "").lower()
-                if any(domain in url for domain in ["arxiv", "nature.com", "sciencedirect", "springer", "ieee", "acm"]):
-                    academic_sources.append({
-                        "title": result.get("title", ""),
-                        "url": result.get("url", ""),
-                    })
-
-        except Exception as e:
-            research_content.append(f"Search error for '{query}': {str(e)}")
+    for query, response in zip(queries, responses):
+        if isinstance(response, asyncio.TimeoutError):
+            research_content.append(f"Search error for '{query}': timed out after {api_config.search_timeout:.0f}s")
+            continue
+        if isinstance(response, Exception):
+            research_content.append(f"Search error for '{query}': {str(response)}")
+            continue
+
+        for result in response.get("results", []):
+            content = f"Source: {result.get('title', 'Unknown')}\n"
+            content += f"URL: {result.get('url', '')}\n"
+            content += f"Content: {result.get('content', '')}\n"
+            research_content.append(content)
+
+            # Track academic sources
+            url = result.get("url", "").lower()
+            if any(domain in url for domain in ["arxiv", "nature.com", "sciencedirect", "springer", "ieee", "acm"]):
+                academic_sources.append({
+                    "title": result.get("title", ""),
+                    "url": result.get("url", ""),
+                })
 
     return {
         "research_content": research_content,
         "academic_sources": [f"{s['title']} - {s['url']}" for s in academic_sources],
     }
+
+
+def research_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aresearch_node"""
+    return asyncio.run(aresearch_node(state, site_config, api_config))
@@ -2,11 +2,17 @@
 SEO Node - Generate metadata and optimize for search
 """
 
-import anthropic
-from typing import Dict, Any
+import re
+import asyncio
+from typing import Dict, Any, Optional
 
 from ..state import BlogState
 from ..config import SiteConfig, APIConfig
+from ..clients import ClientRegistry, borrow_clients
+from ..prompts import Field, build_prompt
+
+
+CONTENT_PREVIEW_TOKENS = 400  # Start of the article shown to the model
 
 
 SEO_PROMPT = """Generate SEO metadata for this blog post.
@@ -34,7 +40,45 @@ SLUG: [url-slug]
 """
 
 
-def seo_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+# Response field -> (state key, maximum length; 0 = unlimited)
+SEO_FIELDS = {
+    "META_DESCRIPTION": ("meta_description", 160),
+    "EXCERPT": ("excerpt", 140),
+    "FOCUS_KEYWORD_SHORT": ("focus_keyword_short", 0),
+    "FOCUS_KEYWORD_LONG": ("focus_keyword_long", 0),
+    "SLUG": ("slug", 60),
+}
+
+_NON_SLUG_CHARS = re.compile(r"[\W_]+")
+
+
+def parse_seo(text: str) -> Dict[str, str]:
+    """Extract the KEY: value fields from the SEO response (last occurrence wins)"""
+    result = {key: "" for key, _ in SEO_FIELDS.values()}
+    for line in text.splitlines():
+        name, sep, value = line.strip().partition(":")
+        field = SEO_FIELDS.get(name) if sep else None
+        if field is None:
+            continue
+        key, limit = field
+        value = value.strip()
+        if key == "slug":
+            value = value.lower()
+        result[key] = value[:limit] if limit else value
+    return result
+
+
+def slugify(text: str, max_length: int = 60) -> str:
+    """Lowercase text with runs of non-alphanumeric characters replaced by one hyphen"""
+    return _NON_SLUG_CHARS.sub("-", text.lower()).strip("-")[:max_length]
+
+
+async def aseo_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Generate SEO metadata for the blog post.
 
@@ -42,56 +86,39 @@ def seo_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -
         state: Current blog state
         site_config: Site-specific configuration
         api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Updated state with meta_description, excerpt, focus keywords, slug
     """
-    client = anthropic.Anthropic(api_key=api_config.anthropic_api_key)
-
-    content_preview = state.get("full_content", state.get("intro_content", ""))[:1500]
+    content = state.get("full_content", state.get("intro_content", ""))
 
-    prompt = SEO_PROMPT.format(
+    prompt, _ = build_prompt(
+        "seo",
+        SEO_PROMPT,
         title=state.get("title", state["topic"]),
         topic=state["topic"],
         primary_keyword=state.get("primary_keyword") or state["topic"],
-        content_preview=content_preview,
+        content_preview=Field(content, CONTENT_PREVIEW_TOKENS),
     )
 
-    response = client.messages.create(
-        model=api_config.claude_model,
-        max_tokens=500,
-        temperature=0.3,
-        messages=[{"role": "user", "content": prompt}],
-    )
+    async with borrow_clients(clients, api_config) as clients:
+        response = await clients.create_message(
+            model=api_config.claude_model,
+            max_tokens=500,
+            temperature=0.3,
+            messages=[{"role": "user", "content": prompt}],
+        )
 
-    # Parse response
-    result = {
-        "meta_description": "",
-        "excerpt": "",
-        "focus_keyword_short": "",
-        "focus_keyword_long": "",
-        "slug": "",
-    }
-
-    for line in response.content[0].text.split("\n"):
-        line = line.strip()
-        if line.startswith("META_DESCRIPTION:"):
-            result["meta_description"] = line.replace("META_DESCRIPTION:", "").strip()[:160]
-        elif line.startswith("EXCERPT:"):
-            result["excerpt"] = line.replace("EXCERPT:", "").strip()[:140]
-        elif line.startswith("FOCUS_KEYWORD_SHORT:"):
-            result["focus_keyword_short"] = line.replace("FOCUS_KEYWORD_SHORT:", "").strip()
-        elif line.startswith("FOCUS_KEYWORD_LONG:"):
-            result["focus_keyword_long"] = line.replace("FOCUS_KEYWORD_LONG:", "").strip()
-        elif line.startswith("SLUG:"):
-            result["slug"] = line.replace("SLUG:", "").strip().lower()[:60]
+    result = parse_seo(response.content[0].text)
 
     # Fallback slug generation if not provided
     if not result["slug"]:
-        title = state.get("title", state["topic"])
-        slug = title.lower()
-        slug = "".join(c if c.isalnum() or c == "-" else "-" for c in slug)
-        slug = "-".join(filter(None, slug.split("-")))
-        result["slug"] = slug[:60]
+        result["slug"] = slugify(state.get("title", state["topic"]))
 
     return result
+
+
+def seo_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around aseo_node"""
+    return asyncio.run(aseo_node(state, site_config, api_config))
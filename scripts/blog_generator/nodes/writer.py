@@ -2,26 +2,52 @@
 Writer Node - Generate blog content using Claude
 """
 
-import anthropic
-from typing import Dict, Any
+import os
+import re
+import time
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, List, Optional
 
 from ..state import BlogState
 from ..config import SiteConfig, APIConfig
+from ..clients import ClientRegistry, borrow_clients
+from ..retrieval import PassageIndex
+from ..metrics import warn
+from ..prompts import Field, build_prompt, estimate_tokens, min_cacheable_tokens, truncate_tokens
 
 
-INTRO_PROMPT = """Write an engaging introduction for a blog post.
+# Token budgets for the variable prompt fields
+RESEARCH_TOKENS = 3000  # Shared research block (when per-section retrieval is off)
+SUMMARY_TOKENS = 400  # Rolling summary of the article so far, for sections and the conclusion
+PREVIOUS_ENDING_TOKENS = 120  # Last lines of the previous section, for continuity
+TRANSITION_EXCERPT_TOKENS = 75  # Each side of a section boundary
+
+
+# Shared by every writer call and sent as a cached system prefix, so the
+# outline and research are only processed once per post. With per-section
+# retrieval the research is the pool of passages any call selected, labelled
+# P1, P2, ...; each call's prompt names the passages it should draw on
+CONTEXT_PROMPT = """You are writing a blog post.
 
 TITLE: {title}
 TOPIC: {topic}
 SITE: {site_name}
 AUTHOR: {author}
-TARGET: {word_count} total words (intro should be ~300 words)
+TARGET: {word_count} total words
+TONE: {tone}
 
 OUTLINE:
 {plan}
 
 RESEARCH:
 {research}
+"""
+
+
+INTRO_PROMPT = """Write an engaging introduction for this blog post (~300 words).
+
+RESEARCH FOR THE INTRODUCTION:
+{research}
 
 Write a compelling introduction that:
 1. Opens with a hook (surprising fact, question, or bold statement)
@@ -36,20 +62,22 @@ Do NOT include the title - just the introduction content.
 
 SECTION_PROMPT = """Write the content for this blog section.
 
-BLOG TITLE: {title}
 SECTION: {section_title}
 KEY POINTS TO COVER:
 {key_points}
 
-RESEARCH CONTEXT:
+RESEARCH FOR THIS SECTION:
 {research}
 
-PREVIOUS SECTIONS (for context, don't repeat):
-{previous_sections}
+ARTICLE SO FAR (summary - don't repeat these points):
+{article_summary}
+
+END OF THE PREVIOUS SECTION (continue naturally from here):
+{previous_ending}
 
 Write ~{section_word_count} words for this section.
 - Use H3 subheadings where appropriate
-- Include specific examples, data, or case studies
+- Include specific examples, data, or case studies from the research
 - Write in a {tone} tone
 - Make it actionable and valuable
 - Do NOT repeat content from previous sections
@@ -58,12 +86,44 @@ Start directly with the section content (no need to include the section title, I
 """
 
 
+PARALLEL_SECTION_PROMPT = """Write the content for this blog section.
+
+SECTION: {section_title}
+KEY POINTS TO COVER:
+{key_points}
+
+RESEARCH FOR THIS SECTION:
+{research}
+
+OTHER SECTIONS (written separately - don't cover their points):
+{other_sections}
+
+Write ~{section_word_count} words for this section.
+- Use H3 subheadings where appropriate
+- Include specific examples, data, or case studies from the research
+- Write in a {tone} tone
+- Make it actionable and valuable
+- Stay within this section's key points
+
+Start directly with the section content (no need to include the section title, I'll add it).
+"""
+
+
+TRANSITIONS_PROMPT = """The sections of this blog post were written independently.
+For each boundary below, write ONE short sentence to open the second section
+so it follows naturally from the first. Don't repeat the section title.
+
+{boundaries}
+
+Respond with one line per boundary in this format:
+1. <transition sentence>
+"""
+
+
 CONCLUSION_PROMPT = """Write a compelling conclusion for this blog post.
 
-TITLE: {title}
-TOPIC: {topic}
-FULL CONTENT SO FAR:
-{content}
+ARTICLE SUMMARY:
+{article_summary}
 
 Write a conclusion (~300 words) that:
 1. Summarizes the key insights
@@ -75,7 +135,12 @@ Tone: {tone}
 """
 
 
-def writer_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+async def awriter_node(
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+    clients: Optional[ClientRegistry] = None,
+) -> Dict[str, Any]:
     """
     Generate full blog content using Claude.
 
@@ -83,14 +148,26 @@ def writer_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
         state: Current blog state
         site_config: Site-specific configuration
         api_config: API keys configuration
+        clients: Shared API clients (a temporary registry is used if not provided)
 
     Returns:
         Updated state with intro_content, main_sections, conclusion_content, full_content
     """
-    client = anthropic.Anthropic(api_key=api_config.anthropic_api_key)
-
-    research_text = "\n\n".join(state.get("research_content", [])[:5])
+    async with borrow_clients(clients, api_config) as clients:
+        return await _write_post(clients, state, site_config, api_config)
+
+
+async def _write_post(
+    clients: ClientRegistry,
+    state: BlogState,
+    site_config: SiteConfig,
+    api_config: APIConfig,
+) -> Dict[str, Any]:
+    """Write intro, sections and conclusion, sequentially or with parallel sections"""
+    # Empty when every search failed or nothing survived ranking
+    research = state.get("ranked_research", [])
     sections_outline = state.get("sections_outline", [])
+    tone = site_config.tone.value
 
     # Calculate word distribution
     total_words = state["target_word_count"]
@@ -99,85 +176,212 @@ def writer_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
     num_sections = max(len(sections_outline) - 2, 3)  # Exclude intro/conclusion
     section_words = (total_words - intro_words - conclusion_words) // num_sections
 
-    # Generate introduction
-    intro_prompt = INTRO_PROMPT.format(
+    body_sections = [
+        section for section in sections_outline
+        if section["title"].lower() not in ["introduction", "conclusion"]
+    ]
+    intro_query = f"{state['topic']} {state.get('primary_keyword') or ''} {state['title']}"
+
+    # Each call is pointed at the research passages relevant to it, within a
+    # token budget. The passages all calls selected go in the cached prefix,
+    # so the prefix stays identical (and cacheable) across calls. With a zero
+    # budget the full research is shared instead
+    research_field: Any = (
+        Field(research, RESEARCH_TOKENS, keep="items") if research
+        else "(no research available - rely on the outline)"
+    )
+    selections: Dict[str, List[int]] = {}
+    labels: Dict[int, str] = {}
+    if api_config.section_research_tokens and research:
+        index = PassageIndex.from_sources(research)
+        for query in [intro_query] + [_section_query(section) for section in body_sections]:
+            selections[query] = index.rank(query, api_config.section_research_tokens)
+        pool = sorted(set().union(*selections.values()))
+        labels = {i: f"P{n}" for n, i in enumerate(pool, start=1)}
+        research_field = "\n\n".join(
+            f"[{labels[i]}] {index.passages[i]}" for i in pool
+        ) or "(no closely matching research)"
+
+    def research_for(query: str) -> str:
+        if not api_config.section_research_tokens:
+            return "(see RESEARCH above)"
+        selected = [labels[i] for i in selections.get(query, [])]
+        if not selected:
+            return "(no closely matching research - rely on the outline)"
+        return f"Passages {', '.join(selected)} in RESEARCH above"
+
+    # Stable prefix for every call; only the instructions after it change
+    context_prompt, _ = build_prompt(
+        "writer_context",
+        CONTEXT_PROMPT,
         title=state["title"],
         topic=state["topic"],
         site_name=site_config.name,
         author=site_config.author,
         word_count=total_words,
+        tone=tone,
         plan=state["plan"],
-        research=research_text,
-        tone=site_config.tone.value,
-    )
-
-    intro_response = client.messages.create(
-        model=api_config.claude_model,
-        max_tokens=1500,
-        temperature=0.4,
-        messages=[{"role": "user", "content": intro_prompt}],
+        research=research_field,
     )
-    intro_content = intro_response.content[0].text
-
-    # Generate main sections
-    main_sections = []
-    previous_content = intro_content
-
-    for i, section in enumerate(sections_outline):
-        if section["title"].lower() in ["introduction", "conclusion"]:
-            continue
-
-        key_points = "\n".join([f"- {p}" for p in section.get("key_points", [])])
-
-        section_prompt = SECTION_PROMPT.format(
-            title=state["title"],
-            section_title=section["title"],
-            key_points=key_points or "Cover this topic thoroughly",
-            research=research_text,
-            previous_sections=previous_content[-2000:],  # Last 2000 chars for context
-            section_word_count=section_words,
-            tone=site_config.tone.value,
+    system = [{
+        "type": "text",
+        "text": context_prompt,
+        "cache_control": {"type": "ephemeral"},
+    }]
+    # Below the model's minimum the marker is ignored and every call pays full price
+    prefix_tokens, minimum = estimate_tokens(context_prompt), min_cacheable_tokens(api_config.claude_model)
+    if prefix_tokens < minimum:
+        warn(
+            "writer_prefix_uncacheable",
+            f"writer context prefix is ~{prefix_tokens} tokens, below the {minimum}-token "
+            f"minimum {api_config.claude_model} caches; it is sent uncached",
+            prefix_tokens=prefix_tokens,
+            minimum=minimum,
         )
 
-        section_response = client.messages.create(
-            model=api_config.claude_model,
-            max_tokens=2000,
-            temperature=0.4,
-            messages=[{"role": "user", "content": section_prompt}],
-        )
+    # With streaming, text is appended to a draft file as it arrives
+    draft = Draft(_draft_path(api_config.draft_dir, state["title"])) if api_config.stream_writer else None
+    write_draft = draft.write if draft else None
 
-        section_content = section_response.content[0].text
-        main_sections.append({
-            "title": section["title"],
-            "content": section_content,
-        })
-        previous_content += f"\n\n## {section['title']}\n\n{section_content}"
+    # Cached prefix tokens written and read across the post's calls
+    cache_usage = {"cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
 
-    # Generate conclusion
-    conclusion_prompt = CONCLUSION_PROMPT.format(
-        title=state["title"],
-        topic=state["topic"],
-        content=previous_content[-4000:],
-        tone=site_config.tone.value,
-    )
+    def complete(prompt: str, max_tokens: int, label: str, on_text=None) -> Awaitable[str]:
+        return _complete(clients, api_config, system, prompt, max_tokens, label, on_text, cache_usage)
 
-    conclusion_response = client.messages.create(
-        model=api_config.claude_model,
-        max_tokens=1500,
-        temperature=0.4,
-        messages=[{"role": "user", "content": conclusion_prompt}],
+    intro_prompt, _ = build_prompt(
+        "intro",
+        INTRO_PROMPT,
+        research=research_for(intro_query),
+        tone=tone,
     )
-    conclusion_content = conclusion_response.content[0].text
 
-    # Combine full content
-    full_content = f"# {state['title']}\n\n"
-    full_content += intro_content + "\n\n"
-    for section in main_sections:
-        full_content += f"## {section['title']}\n\n{section['content']}\n\n"
-    full_content += "## Conclusion\n\n" + conclusion_content
+    # The article is kept as a list of parts and joined once at the end
+    parts = [f"# {state['title']}\n\n"]
+    if draft:
+        draft.write(parts[0])
+
+    try:
+        if api_config.parallel_sections:
+            async def write_section(i: int, section: Dict[str, Any]) -> str:
+                # Every section sees the outline (in the shared prefix) and its
+                # siblings' key points instead of the prose written before it
+                prompt, _ = build_prompt(
+                    "parallel_section",
+                    PARALLEL_SECTION_PROMPT,
+                    section_title=section["title"],
+                    key_points=_format_key_points(section),
+                    research=research_for(_section_query(section)),
+                    other_sections=_format_other_sections(body_sections, i),
+                    section_word_count=section_words,
+                    tone=tone,
+                )
+                content = await complete(prompt, 2000, section["title"])
+                # Concurrent streams would interleave, so whole sections are
+                # added to the draft in the order they finish
+                if draft:
+                    draft.write(f"## {section['title']}\n\n{content}\n\n")
+                return content
+
+            # The cached prefix is only readable once a call has written it;
+            # calls started alongside that first one would each pay to write
+            # it again. So the introduction goes first and the sections (and
+            # later the conclusion and transitions) read the cached prefix
+            intro_content = await complete(intro_prompt, 1500, "Introduction")
+            section_contents = await asyncio.gather(
+                *(write_section(i, section) for i, section in enumerate(body_sections))
+            )
+            main_sections = [
+                {"title": section["title"], "content": content}
+                for section, content in zip(body_sections, section_contents)
+            ]
+            summary = RollingSummary(SUMMARY_TOKENS)
+            summary.add("Introduction", intro_content)
+            for section in main_sections:
+                summary.add(section["title"], section["content"])
+
+            conclusion_prompt, _ = build_prompt(
+                "conclusion",
+                CONCLUSION_PROMPT,
+                article_summary=summary.render(),
+                tone=tone,
+            )
+            conclusion_content, transitions = await asyncio.gather(
+                complete(conclusion_prompt, 1500, "Conclusion"),
+                _write_transitions(complete, main_sections),
+            )
+            for section, transition in zip(main_sections, transitions):
+                if transition:
+                    section["content"] = f"{transition}\n\n{section['content']}"
+
+            parts += [intro_content, "\n\n"]
+            for section in main_sections:
+                parts += [f"## {section['title']}\n\n", section["content"], "\n\n"]
+        else:
+            intro_content = await complete(intro_prompt, 1500, "Introduction", write_draft)
+            parts += [intro_content, "\n\n"]
+
+            # Constant-size context: a summary of everything written so far
+            # plus the end of the previous section
+            summary = RollingSummary(SUMMARY_TOKENS)
+            summary.add("Introduction", intro_content)
+            previous_section = intro_content
+
+            main_sections = []
+            for section in body_sections:
+                heading = f"## {section['title']}\n\n"
+                if draft:
+                    draft.write("\n\n" + heading)
+                section_prompt, _ = build_prompt(
+                    "section",
+                    SECTION_PROMPT,
+                    section_title=section["title"],
+                    key_points=_format_key_points(section),
+                    research=research_for(_section_query(section)),
+                    article_summary=summary.render(),
+                    previous_ending=Field(previous_section, PREVIOUS_ENDING_TOKENS, keep="tail"),
+                    section_word_count=section_words,
+                    tone=tone,
+                )
+                section_content = await complete(section_prompt, 2000, section["title"], write_draft)
+                main_sections.append({
+                    "title": section["title"],
+                    "content": section_content,
+                })
+                parts += [heading, section_content, "\n\n"]
+                summary.add(section["title"], section_content)
+                previous_section = section_content
+
+            if draft:
+                draft.write("\n\n## Conclusion\n\n")
+            conclusion_prompt, _ = build_prompt(
+                "conclusion",
+                CONCLUSION_PROMPT,
+                article_summary=summary.render(),
+                tone=tone,
+            )
+            conclusion_content = await complete(conclusion_prompt, 1500, "Conclusion", write_draft)
+
+        # Combine full content
+        parts += ["## Conclusion\n\n", conclusion_content]
+        full_content = "".join(parts)
+        if draft:
+            # Replace the live draft (which may hold retried or out-of-order text)
+            draft.replace(full_content)
+    finally:
+        if draft:
+            draft.close()
+
+    if not any(cache_usage.values()):
+        warn(
+            "writer_prompt_cache_unused",
+            f"no writer call for \"{state['title']}\" wrote or read the prompt cache; "
+            "the context prefix was billed in full on every call",
+            prefix_tokens=prefix_tokens,
+        )
 
     # Calculate word count
-    word_count = len(full_content.split())
+    word_count = count_words(full_content)
     reading_time = f"{max(1, word_count // 200)} min read"
 
     return {
@@ -188,3 +392,190 @@ def writer_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig
         "word_count": word_count,
         "reading_time": reading_time,
     }
+
+
+async def _complete(
+    clients: ClientRegistry,
+    api_config: APIConfig,
+    system: List[Dict[str, Any]],
+    prompt: str,
+    max_tokens: int,
+    label: str = "",
+    on_text: Optional[Callable[[str], None]] = None,
+    cache_usage: Optional[Dict[str, int]] = None,
+) -> str:
+    """
+    One writer call on top of the shared cached prefix, streamed if enabled.
+
+    The response's cache token counts are added to cache_usage, if given.
+    """
+    request = {
+        "model": api_config.claude_model,
+        "max_tokens": max_tokens,
+        "temperature": 0.4,
+        "system": system,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if not api_config.stream_writer:
+        response = await clients.create_message(**request)
+        _add_cache_usage(cache_usage, response)
+        return response.content[0].text
+
+    start = time.perf_counter()
+    first_token = []
+
+    def receive(text: str):
+        if not first_token:
+            first_token.append(time.perf_counter() - start)
+            print(f"  {label or 'Writer'}: first token after {first_token[0]:.1f}s")
+        if on_text:
+            on_text(text)
+
+    response = await clients.stream_message(receive, **request)
+    _add_cache_usage(cache_usage, response)
+    return response.content[0].text
+
+
+def _add_cache_usage(cache_usage: Optional[Dict[str, int]], response: Any):
+    if cache_usage is None:
+        return
+    usage = getattr(response, "usage", None)
+    for field in cache_usage:
+        cache_usage[field] += getattr(usage, field, 0) or 0
+
+
+class Draft:
+    """Markdown file the writer appends streamed text to, so a post can be watched as it forms"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        print(f"  Draft: {path}")
+
+    def write(self, text: str):
+        self._file.write(text)
+        self._file.flush()
+
+    def replace(self, content: str):
+        """Overwrite the draft with the final content"""
+        self._file.seek(0)
+        self._file.truncate()
+        self.write(content)
+
+    def close(self):
+        self._file.close()
+
+
+class RollingSummary:
+    """
+    Extractive running summary of the sections written so far.
+
+    Each section is reduced locally (no model call) to its opening sentence
+    and H3 subheadings. When the summary outgrows its token budget, the
+    oldest sections are shortened to their title and subheadings first, so
+    the context stays the same size however long the post gets.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.entries: List[Dict[str, str]] = []
+
+    def add(self, title: str, content: str):
+        headings = re.findall(r"^###\s+(.+)$", content, flags=re.MULTILINE)
+        prose = [
+            line.strip() for line in content.split("\n")
+            if line.strip() and not line.lstrip().startswith(("#", "-", "*", "|", ">"))
+        ]
+        opening = re.split(r"(?<=[.!?])\s+", prose[0])[0] if prose else ""
+        self.entries.append({
+            "title": title,
+            "covers": "; ".join(heading.strip() for heading in headings),
+            "opening": opening,
+        })
+
+    def render(self) -> str:
+        if not self.entries:
+            return "(nothing yet)"
+
+        detailed = len(self.entries)
+        while True:
+            lines = []
+            for i, entry in enumerate(self.entries):
+                line = f"- {entry['title']}"
+                if entry["covers"]:
+                    line += f" (covers: {entry['covers']})"
+                if i >= len(self.entries) - detailed and entry["opening"]:
+                    line += f": {entry['opening']}"
+                lines.append(line)
+            text = "\n".join(lines)
+            if detailed == 0 or estimate_tokens(text) <= self.budget:
+                return truncate_tokens(text, self.budget, keep="tail")
+            detailed -= 1
+
+
+def _draft_path(draft_dir: str, title: str) -> str:
+    name = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:60] or "draft"
+    return os.path.join(draft_dir, f"{name}.md")
+
+
+def _format_key_points(section: Dict[str, Any]) -> str:
+    key_points = "\n".join([f"- {p}" for p in section.get("key_points", [])])
+    return key_points or "Cover this topic thoroughly"
+
+
+def _section_query(section: Dict[str, Any]) -> str:
+    return " ".join([section["title"]] + list(section.get("key_points", [])))
+
+
+def _format_other_sections(sections: List[Dict[str, Any]], index: int) -> str:
+    """Titles and key points of every section except sections[index]"""
+    return "\n\n".join(
+        f"{section['title']}:\n{_format_key_points(section)}"
+        for i, section in enumerate(sections)
+        if i != index
+    ) or "(none)"
+
+
+async def _write_transitions(
+    complete: Callable[..., Awaitable[str]],
+    sections: List[Dict[str, str]],
+) -> List[str]:
+    """
+    One opening transition sentence per section after the first.
+
+    Returns a list aligned with sections; entries are empty where no
+    transition is needed or the response could not be parsed.
+    """
+    transitions = [""] * len(sections)
+    if len(sections) < 2:
+        return transitions
+
+    boundaries = "\n\n".join(
+        f"{i}. FROM \"{previous['title']}\" "
+        f"(ends: {truncate_tokens(previous['content'], TRANSITION_EXCERPT_TOKENS, keep='tail')})\n"
+        f"   TO \"{section['title']}\" "
+        f"(starts: {truncate_tokens(section['content'], TRANSITION_EXCERPT_TOKENS)})"
+        for i, (previous, section) in enumerate(zip(sections, sections[1:]), start=1)
+    )
+    prompt, _ = build_prompt("transitions", TRANSITIONS_PROMPT, boundaries=boundaries)
+    text = await complete(prompt, 600, "Transitions")
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if line and line[0].isdigit() and "." in line:
+            number, sentence = line.split(".", 1)
+            if number.isdigit() and 1 <= int(number) < len(sections):
+                transitions[int(number)] = sentence.strip()
+
+    return transitions
+
+
+def count_words(text: str) -> int:
+    """Whitespace-separated words in text"""
+    return len(text.split())
+
+
+def writer_node(state: BlogState, site_config: SiteConfig, api_config: APIConfig) -> Dict[str, Any]:
+    """Synchronous wrapper around awriter_node"""
+    return asyncio.run(awriter_node(state, site_config, api_config))
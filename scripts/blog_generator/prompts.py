@@ -0,0 +1,135 @@
+"""
+Prompt Builder - Fill prompt templates with per-field token budgets
+
+Each template field can be given a token budget. Oversized fields are cut
+to fit, keeping the head (e.g. a content preview), the tail (e.g. the most
+recent sections) or whole items (e.g. research sources, best first). The
+tokens each field used are emitted as a "prompt" metrics record:
+    {"type": "prompt", "template": "section", "fields": {"research": 612, ...}, "total": 1480}
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+
+from .metrics import emit
+
+
+# Words, numbers and single punctuation marks; long words count as several tokens
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+
+
+# Shortest prompt prefix Anthropic caches, by model name prefix (first match
+# wins); shorter prefixes are sent uncached even with a cache_control marker
+MIN_CACHEABLE_TOKENS = (
+    ("claude-opus-4-5", 4096),
+    ("claude-haiku-4-5", 4096),
+    ("claude-3-5-haiku", 2048),
+    ("claude-3-haiku", 2048),
+)
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024  # Other Opus and Sonnet models
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """Minimum prefix length (tokens) that prompt caching applies to for model"""
+    for prefix, tokens in MIN_CACHEABLE_TOKENS:
+        if model.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHEABLE_TOKENS
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate (no tokenizer download or API call).
+
+    Counts words, digit runs and punctuation, with one extra token per six
+    characters of long words/numbers. Unlike len(text) / 4 it does not
+    undercount punctuation-heavy text such as markdown, URLs and numbers.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_PIECES.findall(text))
+
+
+def truncate_tokens(text: str, budget: int, keep: str = "head") -> str:
+    """
+    Cut text to about budget tokens at a word boundary.
+
+    Args:
+        text: Text to cut
+        budget: Maximum estimated tokens
+        keep: "head" keeps the start, "tail" keeps the end
+
+    Returns:
+        text unchanged if it fits, otherwise the kept part marked with "..."
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    if budget <= 0:
+        return ""
+
+    # Proportional cut, then shrink until the estimate fits
+    length = int(len(text) * budget / tokens)
+    while length > 0:
+        if keep == "tail":
+            cut = text[len(text) - length:]
+            space = cut.find(" ")
+            cut = "..." + (cut[space + 1:] if 0 <= space < 40 else cut)
+        else:
+            cut = text[:length]
+            space = cut.rfind(" ")
+            cut = (cut[:space] if space > len(cut) - 40 else cut) + "..."
+        if estimate_tokens(cut) <= budget:
+            return cut
+        length = int(length * 0.9)
+    return ""
+
+
+@dataclass
+class Field:
+    """A template value with an optional token budget"""
+    value: Union[str, List[str]]
+    budget: int = 0  # 0 = unbounded
+    keep: str = "head"  # "head", "tail" or "items" (whole list items, in order)
+    separator: str = "\n\n"
+
+    def render(self) -> str:
+        items = [self.value] if isinstance(self.value, str) else list(self.value)
+        if not self.budget:
+            return self.separator.join(items)
+
+        if self.keep == "items":
+            kept, used = [], 0
+            for item in items:
+                cost = estimate_tokens(item) + (estimate_tokens(self.separator) if kept else 0)
+                if used + cost > self.budget:
+                    break
+                kept.append(item)
+                used += cost
+            if not kept and items:
+                # Never drop everything: cut the first item instead
+                kept = [truncate_tokens(items[0], self.budget)]
+            return self.separator.join(kept)
+
+        return truncate_tokens(self.separator.join(items), self.budget, self.keep)
+
+
+def build_prompt(name: str, template: str, **fields: Union[str, int, Field]) -> Tuple[str, Dict[str, int]]:
+    """
+    Format template, fitting each Field into its budget.
+
+    Args:
+        name: Template name used in the metrics record
+        template: str.format template
+        **fields: Template values; plain values are used as-is
+
+    Returns:
+        (prompt, tokens used per field)
+    """
+    rendered = {
+        key: value.render() if isinstance(value, Field) else value
+        for key, value in fields.items()
+    }
+    usage = {key: estimate_tokens(str(value)) for key, value in rendered.items()}
+    prompt = template.format(**rendered)
+    emit({"type": "prompt", "template": name, "fields": usage, "total": estimate_tokens(prompt)})
+    return prompt, usage
@@ -0,0 +1,207 @@
+"""
+Rate Limiting - Per-provider token buckets with Retry-After aware backoff
+
+Every outbound call acquires from its provider's request bucket (and, for
+Claude, an input-token bucket) before it is sent, so concurrent posts share
+one quota. Rate-limit and transient errors are retried with full-jitter
+exponential backoff, waiting at least as long as the provider's Retry-After.
+"""
+
+import time
+import random
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from .prompts import estimate_tokens
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute.
+
+    The level may go negative when a caller is charged more than it reserved
+    (e.g. actual token usage above the estimate); later callers then wait for
+    the debt to be repaid.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Locks bind to an event loop; the sync wrappers run each call on a new one
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until amount is available, then take it"""
+        # Requests larger than the bucket can never fit; let them through
+        # once the bucket is full rather than blocking forever
+        amount = min(amount, self.capacity)
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) without waiting"""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no request is admitted for the given time"""
+        self._refill()
+        self.level = min(self.level, -seconds * self.rate)
+
+
+class ProviderLimiter:
+    """Request and optional token quotas for one provider, plus retry policy"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def acquire(self, tokens: float = 0):
+        """Wait for quota for one request carrying the given number of tokens"""
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens and tokens:
+            await self.tokens.acquire(tokens)
+
+    def reconcile_tokens(self, estimated: float, actual: float):
+        """Correct the token bucket once the real usage is known"""
+        if self.tokens:
+            self.tokens.adjust(actual - min(estimated, self.tokens.capacity))
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential delay, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        tokens: float = 0,
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> T:
+        """
+        Call func under this provider's quota, retrying retryable failures.
+
+        Args:
+            func: Zero-argument coroutine factory making the request
+            tokens: Estimated tokens the request consumes (token bucket)
+            on_retry: Optional callback (attempt, error, delay) before each retry
+
+        Returns:
+            func's result
+
+        Raises:
+            The last error once it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            try:
+                return await func()
+            except Exception as e:
+                status, retry_after = error_status(e)
+                if attempt >= self.max_retries or not is_retryable(e, status):
+                    raise
+
+                delay = self.backoff_delay(attempt, retry_after)
+                if status == 429 and self.requests:
+                    # Hold back every caller sharing this quota, not just this one
+                    self.requests.penalize(retry_after or delay)
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def error_status(error: BaseException) -> tuple:
+    """Extract (HTTP status, Retry-After seconds) from an SDK or httpx error"""
+    response = getattr(error, "response", None)
+    status = (
+        getattr(error, "status_code", None)
+        or getattr(response, "status_code", None)
+        or getattr(error, "code", None)
+    )
+    headers = getattr(response, "headers", None) or {}
+    retry_after = parse_retry_after(headers.get("retry-after"))
+    if retry_after is None and headers.get("retry-after-ms"):
+        retry_after = float(headers["retry-after-ms"]) / 1000
+    return (status if isinstance(status, int) else None), retry_after
+
+
+def is_retryable(error: BaseException, status: Optional[int]) -> bool:
+    """Rate limits, overload, server errors and dropped connections are retryable"""
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    # SDK connection errors (e.g. anthropic.APIConnectionError) carry no status
+    return type(error).__name__ in {"APIConnectionError", "APITimeoutError"}
+
+
+def estimate_request_tokens(request: Any) -> int:
+    """Input-token estimate for a Messages request, made before it is sent"""
+    def text_of(content: Any) -> str:
+        if isinstance(content, str):
+            return content
+        return "\n".join(block.get("text", "") for block in content or [] if isinstance(block, dict))
+
+    text = text_of(request.get("system", "")) + "".join(
+        text_of(message.get("content", "")) for message in request.get("messages", [])
+    )
+    return estimate_tokens(text)
@@ -0,0 +1,190 @@
+"""
+Retrieval - Local near-duplicate detection and relevance ranking of research
+
+Helpers used by the rank stage and the writer:
+- MinHash signatures over word shingles to drop syndicated/near-identical copies
+- Okapi BM25 scoring of documents against a bag-of-words query
+- A NumPy TF-IDF passage index for per-section retrieval under a token budget
+"""
+
+import re
+import math
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .prompts import estimate_tokens
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in into is it its of on or "
+    "that the their this to was what when where which who why will with your you".split()
+)
+
+# Mersenne prime modulus and fixed coefficients so signatures are stable across runs
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_PERMUTATIONS = [
+    (1 + (i * 0x9E3779B97F4A7C15) % (_MINHASH_PRIME - 1), (i * 0xC2B2AE3D27D4EB4F) % _MINHASH_PRIME)
+    for i in range(1, 129)
+]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords"""
+    return [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+
+
+def shingles(tokens: Sequence[str], size: int = 5) -> set:
+    """Hashes of overlapping size-word windows"""
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def minhash(shingle_set: Iterable[int], num_perm: int = 64) -> List[int]:
+    """MinHash signature; matching positions estimate Jaccard similarity"""
+    shingle_set = list(shingle_set)
+    if not shingle_set:
+        return [_MINHASH_PRIME] * num_perm
+    return [
+        min((a * s + b) % _MINHASH_PRIME for s in shingle_set)
+        for a, b in _MINHASH_PERMUTATIONS[:num_perm]
+    ]
+
+
+def estimate_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def dedupe(documents: Sequence[str], threshold: float = 0.8, num_perm: int = 64) -> List[int]:
+    """
+    Indices of documents to keep after near-duplicate removal.
+
+    Of each group of near-duplicates (estimated Jaccard >= threshold) the
+    longest document is kept. Returned indices are in input order.
+    """
+    signatures = [minhash(shingles(tokenize(doc)), num_perm) for doc in documents]
+    by_length = sorted(range(len(documents)), key=lambda i: len(documents[i]), reverse=True)
+
+    kept: List[int] = []
+    for i in by_length:
+        if all(estimate_similarity(signatures[i], signatures[j]) < threshold for j in kept):
+            kept.append(i)
+    return sorted(kept)
+
+
+def bm25_scores(documents: Sequence[str], query: str, k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each document for the query terms"""
+    docs = [Counter(tokenize(doc)) for doc in documents]
+    if not docs:
+        return []
+
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = (sum(lengths) / len(docs)) or 1.0
+    query_terms = set(tokenize(query))
+    doc_freq: Dict[str, int] = {
+        term: sum(1 for doc in docs if term in doc) for term in query_terms
+    }
+
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+def split_passages(source: str, max_words: int = 120) -> List[str]:
+    """
+    Split a formatted research result into passages of about max_words.
+
+    Each passage keeps the result's Source/URL header so the writer can cite it.
+    """
+    header, _, body = source.partition("Content:")
+    if not body:
+        header, body = "", source
+    header = header.strip()
+
+    sentences = re.split(r"(?<=[.!?])\s+", body.strip())
+    passages, current, count = [], [], 0
+    for sentence in sentences:
+        words = len(sentence.split())
+        if current and count + words > max_words:
+            passages.append(" ".join(current))
+            current, count = [], 0
+        current.append(sentence)
+        count += words
+    if current:
+        passages.append(" ".join(current))
+
+    return [f"{header}\n{passage}" if header else passage for passage in passages if passage]
+
+
+class PassageIndex:
+    """L2-normalised TF-IDF matrix over passages, queried by cosine similarity"""
+
+    def __init__(self, passages: Sequence[str]):
+        self.passages = list(passages)
+        docs = [Counter(tokenize(passage)) for passage in self.passages]
+        self.vocabulary: Dict[str, int] = {}
+        for doc in docs:
+            for term in doc:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        matrix = np.zeros((len(docs), len(self.vocabulary)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term, count in doc.items():
+                matrix[row, self.vocabulary[term]] = 1.0 + math.log(count)
+
+        doc_freq = np.count_nonzero(matrix, axis=0)
+        self.idf = np.log((1 + len(docs)) / (1 + doc_freq)).astype(np.float32) + 1.0
+        self.matrix = _normalize_rows(matrix * self.idf)
+
+    @classmethod
+    def from_sources(cls, sources: Sequence[str], max_words: int = 120) -> "PassageIndex":
+        return cls([passage for source in sources for passage in split_passages(source, max_words)])
+
+    def search(self, query: str, token_budget: int, max_passages: int = 8) -> List[str]:
+        """
+        Most similar passages for query, best first, until token_budget is used.
+
+        Passages with no terms in common with the query are never returned.
+        """
+        return [self.passages[i] for i in self.rank(query, token_budget, max_passages)]
+
+    def rank(self, query: str, token_budget: int, max_passages: int = 8) -> List[int]:
+        """Indexes into self.passages of what search() would return"""
+        if not self.passages:
+            return []
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            if term in self.vocabulary:
+                vector[self.vocabulary[term]] = 1.0 + math.log(count)
+        scores = self.matrix @ _normalize_rows(vector * self.idf)
+
+        selected, used = [], 0
+        for i in np.argsort(-scores, kind="stable")[:max_passages]:
+            if scores[i] <= 0:
+                break
+            cost = estimate_tokens(self.passages[i])
+            if used + cost > token_budget:
+                continue
+            selected.append(int(i))
+            used += cost
+        return selected
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
@@ -1,5 +1,5 @@
 """
-Blog State - TypedDict for LangGraph state management
+Blog State - TypedDict of the state shared by the pipeline stages
 """
 
 from typing import TypedDict, List, Optional, Dict, Any
@@ -12,15 +12,28 @@ class ImagePrompt(TypedDict):
     aspect_ratio: str  # "1:1", "16:9", "9:16"
 
 
-class GeneratedImage(TypedDict):
+class ImageVariant(TypedDict):
+    url: str
+    path: str
+    format: str  # "avif", "webp"
+    width: int
+    height: int
+    bytes: int
+
+
+class GeneratedImage(TypedDict, total=False):
     path: str
     alt_text: str
     aspect_ratio: str
     url: Optional[str]  # For Ghost/external hosting
+    width: int
+    height: int
+    variants: List[ImageVariant]  # Resized WebP/AVIF copies, smallest first
+    srcset: Dict[str, str]  # Format -> srcset attribute value
 
 
 class BlogState(TypedDict):
-    """State object passed through the LangGraph pipeline"""
+    """State object passed through the pipeline graph"""
 
     # Input
     topic: str
@@ -36,6 +49,7 @@ class BlogState(TypedDict):
     # Research
     research_content: List[str]
     academic_sources: List[str]
+    ranked_research: List[str]  # Deduplicated, most relevant first (sent to the writer)
 
     # Content
     title: str
@@ -59,6 +73,7 @@ class BlogState(TypedDict):
     slug: str
     reading_time: str
     word_count: int
+    output: Dict[str, Any]
 
     # Errors
     errors: List[str]
@@ -82,6 +97,7 @@ def create_initial_state(
         sections_outline=[],
         research_content=[],
         academic_sources=[],
+        ranked_research=[],
         title="",
         intro_content="",
         main_sections=[],
@@ -97,5 +113,6 @@ def create_initial_state(
         slug="",
         reading_time="",
         word_count=0,
+        output={},
         errors=[],
     )
@@ -6,9 +6,13 @@ Usage:
     python scripts/generate.py --topic "Your topic here" --site ashganda
     python scripts/generate.py --topic "Your topic here" --site cloudgeeks
     python scripts/generate.py --queue  # Process next item from topics queue
+    python scripts/generate.py --queue --batch 4  # Process all due items, 4 at a time
+    python scripts/generate.py --resume <run-id>  # Retry a failed run from its checkpoint
+    python scripts/generate.py --gc-images --site ashganda  # Delete images no post uses
 """
 
 import argparse
+import dataclasses
 import json
 import os
 import sys
@@ -19,7 +23,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from blog_generator.agent import BlogGenerator
+from blog_generator.checkpoint import CheckpointStore
 from blog_generator.config import get_site_config, APIConfig
+from blog_generator.image_store import INDEX_FILENAME, ImageStore, referenced_images
+from blog_generator.metrics import MetricsRecorder
 
 
 def load_topics_queue(site: str) -> list:
@@ -44,8 +51,9 @@ def save_topics_queue(site: str, schedule: list):
         json.dump({"schedule": schedule, "updated_at": datetime.now().isoformat()}, f, indent=2)
 
 
-def get_next_pending_topic(schedule: list) -> tuple:
-    """Get the next pending topic from schedule"""
+def get_pending_topics(schedule: list) -> list:
+    """Get all pending topics whose scheduled date has passed, as (index, item) pairs"""
+    pending = []
     for i, item in enumerate(schedule):
         if item.get("status") == "pending":
             # Check if scheduled date has passed
@@ -58,11 +66,172 @@ def get_next_pending_topic(schedule: list) -> tuple:
                 except (ValueError, TypeError):
                     pass  # Invalid date, process anyway
 
-            return i, item
+            pending.append((i, item))
+
+    return pending
+
+
+def get_next_pending_topic(schedule: list) -> tuple:
+    """Get the next pending topic from schedule"""
+    pending = get_pending_topics(schedule)
+    if pending:
+        return pending[0]
 
     return -1, None
 
 
+def mark_completed(entry: dict, result: dict):
+    """Record a successful generation on a queue entry"""
+    entry["status"] = "completed"
+    entry["completed_at"] = datetime.now().isoformat()
+    entry["result"] = {
+        "title": result["title"],
+        "slug": result["slug"],
+    }
+    entry.pop("last_error", None)
+
+
+def mark_failed(entry: dict, result: dict):
+    """Record a failed attempt on a queue entry; it stays pending, so --queue retries it"""
+    entry["failed_at"] = datetime.now().isoformat()
+    entry["last_error"] = result.get("error")
+    if result.get("run_id"):
+        entry["run_id"] = result["run_id"]
+
+
+def find_queue_entry(schedule: list, queue_id: str):
+    """The queue entry with the given id, or None"""
+    for entry in schedule:
+        if entry.get("id") == queue_id:
+            return entry
+    return None
+
+
+def run_batch(args, api_config: APIConfig, metrics: MetricsRecorder):
+    """Generate every due pending topic in the queue with bounded concurrency"""
+    schedule = load_topics_queue(args.site)
+    pending = get_pending_topics(schedule)
+
+    if not pending:
+        print("No pending topics in queue")
+        sys.exit(0)
+
+    site_config = get_site_config(args.site)
+    print(f"\n{'='*60}")
+    print(f"BLOG GENERATOR - BATCH")
+    print(f"{'='*60}")
+    print(f"Site:        {site_config.name} ({site_config.domain})")
+    print(f"Items:       {len(pending)}")
+    print(f"Concurrency: {args.batch}")
+    for _, item in pending:
+        print(f"  - {item.get('id', 'unknown')}: {item.get('topic')}")
+    print(f"{'='*60}\n")
+
+    if args.dry_run:
+        print("DRY RUN - No content will be generated")
+        sys.exit(0)
+
+    topics = [
+        {
+            "topic": item.get("topic"),
+            "primary_keyword": item.get("keyword") or args.keyword,
+            "word_count": args.words,
+            "image_count": args.images,
+            "tags": item.get("tags") or (args.tags.split(",") if args.tags else None),
+            "queue_id": item.get("id"),
+        }
+        for _, item in pending
+    ]
+
+    generator = BlogGenerator(
+        site=args.site,
+        api_config=api_config,
+        checkpoint_dir=args.checkpoint_dir,
+        metrics=metrics,
+    )
+    results = generator.generate_many(topics, max_concurrency=args.batch)
+
+    # Update the queue once, after every item has finished
+    print(f"\n{'='*60}")
+    failures = 0
+    for (queue_index, item), result in zip(pending, results):
+        entry = schedule[queue_index]
+        if result["success"]:
+            mark_completed(entry, result)
+            print(f"OK      {item.get('id', 'unknown')}: {result['title']} ({result['duration_seconds']:.1f}s)")
+        else:
+            failures += 1
+            mark_failed(entry, result)
+            print(f"FAILED  {item.get('id', 'unknown')}: {result.get('error')}")
+            if result.get("run_id"):
+                print(f"        Resume with: --resume {result['run_id']}")
+
+    save_topics_queue(args.site, schedule)
+    print(f"\nQueue updated: {len(results) - failures} completed, {failures} failed (left pending)")
+    print(f"{'='*60}")
+
+    if failures:
+        sys.exit(1)
+
+
+def collect_image_garbage(args, api_config: APIConfig):
+    """Delete the site's stored images that no post or checkpoint references"""
+    site_config = get_site_config(args.site)
+    store = ImageStore(os.path.join(api_config.llm_cache_dir, INDEX_FILENAME), site_config.images_dir)
+    referenced = referenced_images([site_config.output_dir, args.checkpoint_dir])
+    try:
+        removed = store.collect_garbage(
+            referenced,
+            min_age_seconds=api_config.image_gc_min_age_hours * 3600,
+            dry_run=args.dry_run,
+        )
+    finally:
+        store.close()
+
+    for path in removed:
+        print(f"  {path}")
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(f"{verb} {len(removed)} unreferenced image files from {site_config.images_dir}")
+
+
+def print_result(result: dict):
+    """Print the outcome of a single generation run"""
+    print(f"\n{'='*60}")
+    if result["success"]:
+        print("SUCCESS!")
+        print(f"Title:      {result['title']}")
+        print(f"Slug:       {result['slug']}")
+        print(f"Words:      {result['word_count']}")
+        print(f"Images:     {result['images_generated']}")
+        print(f"Duration:   {result['duration_seconds']:.1f}s")
+
+        output = result.get("output", {})
+        if output.get("output_type") == "mdx":
+            print(f"File:       {output.get('filepath')}")
+        elif output.get("output_type") == "ghost":
+            print(f"Ghost URL:  {output.get('url')}")
+            print(f"Post ID:    {output.get('post_id')}")
+    else:
+        print("FAILED!")
+        print(f"Error: {result.get('error')}")
+        if result.get("run_id"):
+            print(f"Resume with: python scripts/generate.py --resume {result['run_id']}")
+
+
+def print_metrics(metrics: MetricsRecorder):
+    """Print the per-stage and per-call metrics summary"""
+    if not metrics.records:
+        return
+
+    print(f"\n{'='*60}")
+    print("METRICS")
+    print(f"{'='*60}")
+    print(metrics.format_summary())
+    if metrics.path:
+        print(f"\nRecords:    {metrics.path}")
+    print(f"{'='*60}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate AI-powered blog posts",
@@ -75,6 +244,19 @@ Examples:
   # Generate from queue
   python scripts/generate.py --queue --site ashganda
 
+  # Generate every due queue item, 3 posts at a time
+  python scripts/generate.py --queue --batch 3 --site cloudgeeks
+
+  # Retry a failed run, skipping stages that already completed
+  python scripts/generate.py --resume 20250115-060000-cloud-migration-guide-3f9a1c --site cloudgeeks
+
+  # Iterate on the output template without re-billing earlier Claude calls
+  python scripts/generate.py --topic "Cloud Migration Guide" --site ashganda --cache-mode readwrite
+
+  # List, then delete, stored images no post references (and their variants)
+  python scripts/generate.py --gc-images --site ashganda --dry-run
+  python scripts/generate.py --gc-images --site ashganda
+
   # Generate with options
   python scripts/generate.py --topic "Cloud Migration Guide" --site cloudgeeks --words 2500 --images 4
         """,
@@ -100,6 +282,76 @@ Examples:
         help="Process next pending topic from queue",
     )
 
+    parser.add_argument(
+        "--batch",
+        type=int,
+        metavar="N",
+        help="With --queue, process all due pending topics, N at a time",
+    )
+
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Resume a checkpointed run, skipping completed stages",
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default="output/checkpoints",
+        help="Directory for per-stage checkpoints (default: output/checkpoints)",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=f"output/metrics/{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl",
+        help="JSONL file for per-stage/per-call metrics (default: output/metrics/<timestamp>.jsonl)",
+    )
+
+    parser.add_argument(
+        "--parallel-sections",
+        action="store_true",
+        help="Write body sections concurrently, then stitch them with a transition pass",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream writer output into a draft file (output/drafts) and report time to first token",
+    )
+
+    parser.add_argument(
+        "--cache-mode",
+        type=str,
+        choices=["off", "read", "readwrite"],
+        help="On-disk Claude response cache: replay identical prompts (read) "
+             "and store new responses (readwrite) (default: LLM_CACHE_MODE or off)",
+    )
+
+    parser.add_argument(
+        "--research-cache-mode",
+        type=str,
+        choices=["off", "read", "readwrite"],
+        help="On-disk Tavily search cache shared across topics "
+             "(default: RESEARCH_CACHE_MODE or readwrite)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory for the response and research caches "
+             "(default: LLM_CACHE_DIR or .cache/blog_generator)",
+    )
+
+    parser.add_argument(
+        "--gc-images",
+        action="store_true",
+        help="Delete stored images that no post or checkpoint references, once unused for "
+             "IMAGE_GC_MIN_AGE_HOURS (default 168); with --dry-run, only list them",
+    )
+
     parser.add_argument(
         "--keyword",
         type=str,
@@ -132,9 +384,20 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.gc_images:
+        api_config = APIConfig.from_env()
+        if args.cache_dir:
+            api_config = dataclasses.replace(api_config, llm_cache_dir=args.cache_dir)
+        collect_image_garbage(args, api_config)
+        return
+
     # Validate arguments
-    if not args.topic and not args.queue:
-        parser.error("Either --topic or --queue is required")
+    if not args.topic and not args.queue and not args.resume:
+        parser.error("One of --topic, --queue or --resume is required")
+    if args.batch is not None and not args.queue:
+        parser.error("--batch requires --queue")
+    if args.batch is not None and args.batch < 1:
+        parser.error("--batch must be at least 1")
 
     # Check API keys
     api_config = APIConfig.from_env()
@@ -145,11 +408,64 @@ Examples:
     if not api_config.tavily_api_key:
         print("Warning: TAVILY_API_KEY not set. Research will be limited.")
 
+    if args.parallel_sections:
+        api_config = dataclasses.replace(api_config, parallel_sections=True)
+    if args.stream:
+        api_config = dataclasses.replace(api_config, stream_writer=True)
+    if args.cache_mode:
+        api_config = dataclasses.replace(api_config, llm_cache_mode=args.cache_mode)
+    if args.research_cache_mode:
+        api_config = dataclasses.replace(api_config, research_cache_mode=args.research_cache_mode)
+    if args.cache_dir:
+        api_config = dataclasses.replace(api_config, llm_cache_dir=args.cache_dir)
+
+    metrics = MetricsRecorder(args.metrics_file)
+    try:
+        run(args, api_config, metrics)
+    finally:
+        print_metrics(metrics)
+
+
+def run(args, api_config: APIConfig, metrics: MetricsRecorder):
+    """Generate a single post, resume a run, or process the queue"""
+    if args.batch:
+        run_batch(args, api_config, metrics)
+        return
+
+    generator = BlogGenerator(
+        site=args.site,
+        api_config=api_config,
+        checkpoint_dir=args.checkpoint_dir,
+        metrics=metrics,
+    )
+
+    if args.resume:
+        print(f"Resuming run: {args.resume}")
+        try:
+            result = generator.resume(args.resume)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_result(result)
+        if not result["success"]:
+            sys.exit(1)
+
+        # A resumed queue item is marked completed, so --queue doesn't generate it again
+        queue_id = CheckpointStore(args.checkpoint_dir, args.resume).load_run().get("queue_id")
+        schedule = load_topics_queue(args.site) if queue_id else []
+        entry = find_queue_entry(schedule, queue_id) if queue_id else None
+        if entry is not None:
+            mark_completed(entry, result)
+            save_topics_queue(args.site, schedule)
+            print(f"\nQueue updated: {queue_id} marked as completed")
+        return
+
     # Get topic
     topic = args.topic
     keyword = args.keyword
     tags = args.tags.split(",") if args.tags else None
     queue_index = -1
+    queue_id = None
     schedule = None
 
     if args.queue:
@@ -163,6 +479,7 @@ Examples:
         topic = queue_item.get("topic")
         keyword = queue_item.get("keyword") or keyword
         tags = queue_item.get("tags") or tags
+        queue_id = queue_item.get("id")
 
         print(f"Processing queue item: {queue_item.get('id', 'unknown')}")
 
@@ -184,47 +501,29 @@ Examples:
         sys.exit(0)
 
     # Generate blog
-    generator = BlogGenerator(site=args.site, api_config=api_config)
-
     result = generator.generate(
         topic=topic,
         primary_keyword=keyword,
         word_count=args.words,
         image_count=args.images,
         tags=tags,
+        queue_id=queue_id,
     )
 
-    # Print result
-    print(f"\n{'='*60}")
-    if result["success"]:
-        print("SUCCESS!")
-        print(f"Title:      {result['title']}")
-        print(f"Slug:       {result['slug']}")
-        print(f"Words:      {result['word_count']}")
-        print(f"Images:     {result['images_generated']}")
-        print(f"Duration:   {result['duration_seconds']:.1f}s")
-
-        output = result.get("output", {})
-        if output.get("output_type") == "mdx":
-            print(f"File:       {output.get('filepath')}")
-        elif output.get("output_type") == "ghost":
-            print(f"Ghost URL:  {output.get('url')}")
-            print(f"Post ID:    {output.get('post_id')}")
+    print_result(result)
 
-        # Update queue if processing from queue
-        if args.queue and schedule is not None and queue_index >= 0:
-            schedule[queue_index]["status"] = "completed"
-            schedule[queue_index]["completed_at"] = datetime.now().isoformat()
-            schedule[queue_index]["result"] = {
-                "title": result["title"],
-                "slug": result["slug"],
-            }
+    # Update queue if processing from queue
+    if args.queue and schedule is not None and queue_index >= 0:
+        if result["success"]:
+            mark_completed(schedule[queue_index], result)
             save_topics_queue(args.site, schedule)
             print("\nQueue updated: marked as completed")
+        else:
+            mark_failed(schedule[queue_index], result)
+            save_topics_queue(args.site, schedule)
+            print("\nQueue updated: error recorded, left pending")
 
-    else:
-        print("FAILED!")
-        print(f"Error: {result.get('error')}")
+    if not result["success"]:
         sys.exit(1)
 
     print(f"{'='*60}")
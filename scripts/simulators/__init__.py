@@ -0,0 +1,15 @@
+"""
+Offline provider simulators for development, load tests and benchmarks
+"""
+
+from .profiles import LatencyProfile, SimulatorProfile, PROFILES, get_profile
+from .server import ProviderSimulator, GHOST_ADMIN_KEY
+
+__all__ = [
+    "LatencyProfile",
+    "SimulatorProfile",
+    "PROFILES",
+    "get_profile",
+    "ProviderSimulator",
+    "GHOST_ADMIN_KEY",
+]
@@ -0,0 +1,49 @@
+"""
+Run the provider simulator until interrupted
+
+Usage (from scripts/):
+    python -m simulators --profile realistic --port 8787
+
+Then point the generator at it:
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8787 TAVILY_BASE_URL=http://127.0.0.1:8787 \\
+    IMAGEN_BASE_URL=http://127.0.0.1:8787 GHOST_API_URL=http://127.0.0.1:8787 \\
+    ANTHROPIC_API_KEY=sim TAVILY_API_KEY=sim GOOGLE_PROJECT_ID=sim \\
+    python generate.py --topic "..." --site ashganda
+"""
+
+import argparse
+import time
+
+from .profiles import PROFILES
+from .server import GHOST_ADMIN_KEY, ProviderSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Anthropic/Tavily/Imagen/Ghost simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES.keys()),
+        default="realistic",
+        help="Latency and failure profile",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every latency by this factor")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and failure sampling")
+    args = parser.parse_args()
+
+    simulator = ProviderSimulator(args.profile, args.host, args.port, args.seed, args.scale).start()
+    print(f"Simulating providers at {simulator.url} (profile: {args.profile}, scale: {args.scale})")
+    print(f"Ghost admin key: {GHOST_ADMIN_KEY}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        print("Calls:", dict(simulator.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Synthetic provider responses in the formats the pipeline's parsers expect
+
+Text is generated deterministically from the request, so identical requests
+get identical responses (and the pipeline's caches behave as in production).
+"""
+
+import re
+import zlib
+import struct
+import random
+import hashlib
+from typing import Any, Dict, List
+
+
+_WORDS = (
+    "cloud platform teams data model automation workload security cost latency "
+    "pipeline migration architecture strategy customers analytics adoption "
+    "integration governance performance scale reliability insight operations "
+    "infrastructure deployment monitoring compliance budget roadmap outcome"
+).split()
+
+
+def seeded(*parts: Any) -> random.Random:
+    """Random generator seeded from the given values"""
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _field(prompt: str, name: str, default: str = "") -> str:
+    match = re.search(rf"^{name}:\s*(.+)$", prompt, flags=re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def sentence(rng: random.Random, topic_words: List[str]) -> str:
+    words = [rng.choice(topic_words if rng.random() < 0.3 and topic_words else _WORDS) for _ in range(rng.randint(8, 18))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), f"{rng.randint(2, 95)}%")
+    return " ".join(words).capitalize() + "."
+
+
+def prose(rng: random.Random, word_count: int, topic: str = "", subheadings: bool = True) -> str:
+    """Paragraphs (with a few H3 subheadings) of about word_count words"""
+    topic_words = re.findall(r"[a-z]+", topic.lower())
+    blocks, words = [], 0
+    while words < word_count:
+        if subheadings and blocks and rng.random() < 0.25:
+            blocks.append("### " + " ".join(rng.choice(_WORDS) for _ in range(3)).title())
+        paragraph = " ".join(sentence(rng, topic_words) for _ in range(rng.randint(3, 5)))
+        blocks.append(paragraph)
+        words += len(paragraph.split())
+    return "\n\n".join(blocks)
+
+
+def plan_response(prompt: str) -> str:
+    """Outline in the TITLE:/SECTIONS: format parsed by plan_node"""
+    topic = _field(prompt, "TOPIC", "Technology")
+    rng = seeded("plan", topic)
+    lines = [f"TITLE: {topic.title()}: A Practical Guide", "", "SECTIONS:", "1. Introduction",
+             "   - Hook: A surprising statistic", "   - Context: Why this matters now",
+             "   - Preview: What the reader will learn", ""]
+    count = rng.randint(4, 6)
+    for i in range(count):
+        subject = " ".join(rng.choice(_WORDS) for _ in range(2))
+        lines.append(f"{i + 2}. {subject.title()} for {topic}")
+        for _ in range(3):
+            lines.append(f"   - {sentence(rng, topic.lower().split())[:-1]}")
+        lines.append("")
+    lines += [f"{count + 2}. Conclusion", "   - Summary", "   - Key Takeaways", "   - Call to Action"]
+    return "\n".join(lines)
+
+
+def seo_response(prompt: str) -> str:
+    """KEY: value lines parsed by seo_node"""
+    title = _field(prompt, "TITLE", "Untitled")
+    keyword = _field(prompt, "PRIMARY KEYWORD", title)
+    slug = "-".join(re.findall(r"[a-z0-9]+", title.lower()))[:60]
+    return "\n".join([
+        f"META_DESCRIPTION: Learn how {keyword} helps teams ship faster, cut costs and reduce risk with this practical guide."[:170],
+        f"EXCERPT: A practical guide to {keyword}."[:150],
+        f"FOCUS_KEYWORD_SHORT: {' '.join(keyword.split()[:2])}",
+        f"FOCUS_KEYWORD_LONG: {' '.join(keyword.split()[:5])}",
+        f"SLUG: {slug}",
+    ])
+
+
+def image_prompts_response(prompt: str) -> str:
+    """IMAGE N:/Prompt:/Alt:/Filename:/Aspect: blocks parsed by generate_image_prompts"""
+    match = re.search(r"Create (\d+) image prompts", prompt)
+    count = int(match.group(1)) if match else 3
+    title = _field(prompt, "TITLE", "blog")
+    rng = seeded("images", title)
+    blocks = []
+    for i in range(count):
+        aspect = "16:9" if i == 0 else rng.choice(["16:9", "1:1", "9:16"])
+        subject = " ".join(rng.choice(_WORDS) for _ in range(3))
+        blocks.append("\n".join([
+            f"IMAGE {i + 1}:",
+            f"Prompt: Minimal illustration of {subject}, violet and cyan accents on a dark background",
+            f"Alt: Illustration of {subject}",
+            f"Filename: {subject.replace(' ', '-')}",
+            f"Aspect: {aspect}",
+        ]))
+    return "\n\n".join(blocks)
+
+
+def transitions_response(prompt: str) -> str:
+    """Numbered transition lines parsed by the writer's stitching pass"""
+    count = len(re.findall(r"^\d+\. FROM ", prompt, flags=re.MULTILINE))
+    rng = seeded("transitions", prompt)
+    return "\n".join(f"{i + 1}. {sentence(rng, [])}" for i in range(count))
+
+
+def message_text(prompt: str, max_tokens: int) -> str:
+    """Pick the response format from the prompt, as the real model would"""
+    if "expert content strategist" in prompt:
+        return plan_response(prompt)
+    if "Generate SEO metadata" in prompt:
+        return seo_response(prompt)
+    if re.search(r"Create \d+ image prompts", prompt):
+        return image_prompts_response(prompt)
+    if "For each boundary below" in prompt:
+        return transitions_response(prompt)
+
+    match = re.search(r"~(\d+) words", prompt)
+    words = int(match.group(1)) if match else 300
+    words = min(words, int(max_tokens * 0.7))
+    return prose(seeded("prose", prompt), words, _field(prompt, "SECTION"))
+
+
+def search_results(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    """
+    Tavily-style results. URLs come from a small shared pool so related
+    queries overlap, and some results are syndicated copies of others.
+    """
+    rng = seeded("search", query)
+    results = []
+    for i in range(max_results):
+        article = rng.randrange(40)
+        body_rng = seeded("article", article)
+        content = prose(body_rng, 150, query, subheadings=False)
+        host = rng.choice(["techcrunch.com", "wired.com", "hbr.org", "arxiv.org", "forbes.com"])
+        if rng.random() < 0.2:
+            # Syndicated copy: same body under another publisher's URL
+            host = "medium.com"
+            content += " Originally published elsewhere."
+        results.append({
+            "title": f"{query.title()} ({article})",
+            "url": f"https://{host}/articles/{article}",
+            "content": content,
+            "score": round(1.0 - i * 0.1, 2),
+            "raw_content": None,
+        })
+    return results
+
+
+def png_bytes(width: int, height: int, seed: Any) -> bytes:
+    """A valid solid-colour PNG (stdlib only)"""
+    rng = seeded("png", seed)
+    pixel = bytes(rng.randrange(256) for _ in range(3))
+    raw = b"".join(b"\x00" + pixel * width for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+IMAGE_SIZES = {"16:9": (320, 180), "1:1": (240, 240), "9:16": (180, 320), "4:3": (320, 240), "3:4": (240, 320)}
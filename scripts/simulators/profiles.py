@@ -0,0 +1,95 @@
+"""
+Latency and failure profiles for the provider simulators
+"""
+
+import math
+import random
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Response behaviour of one simulated provider.
+
+    Latency is drawn from a log-normal distribution fitted to the given
+    median and p95. Failures are drawn independently per request.
+    """
+    median_ms: float = 50.0
+    p95_ms: float = 150.0
+    error_rate: float = 0.0  # Fraction of requests answered with a 5xx
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with a 429
+    retry_after: float = 1.0  # Retry-After seconds sent with 429s
+    stream_chunk_ms: float = 5.0  # Delay between streamed text chunks (Anthropic)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds to wait before answering"""
+        if self.median_ms <= 0:
+            return 0.0
+        sigma = math.log(max(self.p95_ms, self.median_ms) / self.median_ms) / 1.645
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+    def sample_failure(self, rng: random.Random) -> Optional[int]:
+        """HTTP status to fail with, or None"""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+
+@dataclass
+class SimulatorProfile:
+    """Latency profiles for every simulated provider"""
+    anthropic: LatencyProfile = field(default_factory=LatencyProfile)
+    tavily: LatencyProfile = field(default_factory=LatencyProfile)
+    imagen: LatencyProfile = field(default_factory=LatencyProfile)
+    ghost: LatencyProfile = field(default_factory=LatencyProfile)
+
+    def for_provider(self, provider: str) -> LatencyProfile:
+        return getattr(self, provider)
+
+
+PROFILES: Dict[str, SimulatorProfile] = {
+    # No waiting: exercises the pipeline's own overhead
+    "instant": SimulatorProfile(
+        anthropic=LatencyProfile(0, 0, stream_chunk_ms=0),
+        tavily=LatencyProfile(0, 0),
+        imagen=LatencyProfile(0, 0),
+        ghost=LatencyProfile(0, 0),
+    ),
+    # Production-like round trips, scaled down 10x so a run takes seconds
+    "realistic": SimulatorProfile(
+        anthropic=LatencyProfile(800, 2500, stream_chunk_ms=10),
+        tavily=LatencyProfile(300, 900),
+        imagen=LatencyProfile(600, 1500),
+        ghost=LatencyProfile(50, 150),
+    ),
+    # Realistic latency plus rate limits and transient server errors
+    "flaky": SimulatorProfile(
+        anthropic=LatencyProfile(800, 2500, error_rate=0.05, rate_limit_rate=0.1, retry_after=0.5, stream_chunk_ms=10),
+        tavily=LatencyProfile(300, 900, error_rate=0.05, rate_limit_rate=0.05, retry_after=0.5),
+        imagen=LatencyProfile(600, 1500, error_rate=0.05, rate_limit_rate=0.1, retry_after=0.5),
+        ghost=LatencyProfile(50, 150, error_rate=0.02),
+    ),
+}
+
+
+def get_profile(name: str, scale: float = 1.0) -> SimulatorProfile:
+    """A named profile with every latency multiplied by scale"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown simulator profile: {name}. Available: {list(PROFILES.keys())}")
+    profile = PROFILES[name]
+    if scale == 1.0:
+        return profile
+    return SimulatorProfile(**{
+        provider: replace(
+            latency,
+            median_ms=latency.median_ms * scale,
+            p95_ms=latency.p95_ms * scale,
+            stream_chunk_ms=latency.stream_chunk_ms * scale,
+        )
+        for provider, latency in vars(profile).items()
+    })
@@ -0,0 +1,372 @@
+"""
+Provider Simulator - One local HTTP server standing in for Anthropic, Tavily, Imagen and Ghost
+
+Endpoints (wire formats match what the official SDKs and the pipeline expect):
+    POST /v1/messages                      Claude Messages API (JSON or SSE streaming)
+    POST /search                           Tavily search
+    POST .../models/<model>:predict        Imagen via the Gen AI SDK (Vertex express mode)
+    POST /ghost/api/admin/images/upload/   Ghost Admin API image upload (multipart)
+    POST /ghost/api/admin/posts/           Ghost Admin API post creation
+
+Usage:
+    with ProviderSimulator("realistic", seed=1) as sim:
+        generator = BlogGenerator("ashganda", api_config=sim.api_config())
+"""
+
+import re
+import json
+import time
+import uuid
+import base64
+import random
+import threading
+from collections import Counter
+from dataclasses import replace
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .content import IMAGE_SIZES, message_text, png_bytes, search_results
+from .profiles import SimulatorProfile, get_profile
+
+
+# Ghost admin keys are "{id}:{hex secret}"; the simulator accepts any well-formed token
+GHOST_ADMIN_KEY = "5f0c1d2e3a4b5c6d7e8f9a0b:" + "ab" * 32
+
+_ERRORS = {
+    "anthropic": lambda status: {
+        "type": "error",
+        "error": {
+            "type": "rate_limit_error" if status == 429 else "overloaded_error",
+            "message": "Simulated failure",
+        },
+    },
+    "tavily": lambda status: {"detail": {"error": "Simulated failure"}},
+    "imagen": lambda status: {
+        "error": {
+            "code": status,
+            "message": "Simulated failure",
+            "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE",
+        },
+    },
+    "ghost": lambda status: {"errors": [{"message": "Simulated failure", "type": "InternalServerError"}]},
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _text_of(content: Union[str, list]) -> str:
+    if isinstance(content, str):
+        return content
+    return "\n".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+class ProviderSimulator:
+    """
+    Threaded local server simulating every external provider.
+
+    Latency and failures follow the profile; response bodies are derived
+    from the request so identical requests get identical responses. Calls
+    are counted per provider in self.calls.
+    """
+
+    def __init__(
+        self,
+        profile: Union[str, SimulatorProfile] = "instant",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+        scale: float = 1.0,
+    ):
+        self.profile = get_profile(profile, scale) if isinstance(profile, str) else profile
+        self.host = host
+        self.port = port
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes: set = set()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "ProviderSimulator":
+        simulator = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.simulator = simulator
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "ProviderSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def api_config(self, **overrides):
+        """APIConfig with every provider endpoint pointed at this simulator"""
+        from blog_generator.config import APIConfig
+
+        config = APIConfig(
+            anthropic_api_key="simulator",
+            tavily_api_key="simulator",
+            google_project_id="simulator",
+            anthropic_base_url=self.url,
+            tavily_base_url=self.url,
+            imagen_base_url=self.url,
+        )
+        return replace(config, **overrides)
+
+    def site_config(self, site_config):
+        """Copy of a SiteConfig publishing to this simulator's Ghost endpoint"""
+        return replace(site_config, ghost_api_url=self.url, ghost_admin_key=GHOST_ADMIN_KEY)
+
+    def sample(self, provider: str):
+        """(latency seconds, failure status or None) for one request"""
+        latency = self.profile.for_provider(provider)
+        with self._lock:
+            self.calls[provider] += 1
+            failure = latency.sample_failure(self._rng)
+            if failure:
+                self.failures[provider] += 1
+            return latency.sample_latency(self._rng), failure
+
+    def cache_usage(self, system: Any, tokens: int, model: str = "") -> Dict[str, int]:
+        """
+        Prompt-cache usage for a request: system blocks marked with
+        cache_control are written unless already cached (see cache_prefix),
+        and read otherwise. Prefixes shorter than the model's minimum
+        cacheable length are not cached.
+        """
+        key, prefix_tokens = self._cache_key(system, model)
+        if key is None:
+            return {"input_tokens": tokens, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        with self._lock:
+            seen = key in self._cached_prefixes
+        return {
+            "input_tokens": max(1, tokens - prefix_tokens),
+            "cache_creation_input_tokens": 0 if seen else prefix_tokens,
+            "cache_read_input_tokens": prefix_tokens if seen else 0,
+        }
+
+    def cache_prefix(self, system: Any, model: str = ""):
+        """
+        Make a request's cacheable prefix readable by later requests.
+
+        Called once its response starts, as with the real API: requests sent
+        while the first one is still in flight each write the prefix again.
+        """
+        key, _ = self._cache_key(system, model)
+        if key is not None:
+            with self._lock:
+                self._cached_prefixes.add(key)
+
+    @staticmethod
+    def _cache_key(system: Any, model: str) -> Tuple[Optional[str], int]:
+        """Cache key and token count of a request's cacheable prefix (None if it has none)"""
+        from blog_generator.prompts import min_cacheable_tokens
+
+        if not isinstance(system, list):
+            return None, 0
+        cached = [block for block in system if block.get("cache_control")]
+        prefix_tokens = _estimate_tokens(_text_of(cached)) if cached else 0
+        if not cached or prefix_tokens < min_cacheable_tokens(model):
+            return None, 0
+        return json.dumps(cached, sort_keys=True), prefix_tokens
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    simulator: ProviderSimulator
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+
+        if path.startswith("/v1/messages"):
+            provider, handler = "anthropic", self._messages
+        elif path == "/search":
+            provider, handler = "tavily", self._search
+        elif path.endswith(":predict"):
+            provider, handler = "imagen", self._predict
+        elif path.startswith("/ghost/api/admin/images/upload"):
+            provider, handler = "ghost", self._ghost_upload
+        elif path.startswith("/ghost/api/admin/posts"):
+            provider, handler = "ghost", self._ghost_post
+        else:
+            self._json(404, {"error": f"Unknown endpoint: {path}"})
+            return
+
+        delay, failure = self.simulator.sample(provider)
+        if failure:
+            time.sleep(delay / 4)
+            retry_after = self.simulator.profile.for_provider(provider).retry_after
+            headers = {"Retry-After": f"{retry_after:g}"} if failure == 429 else {}
+            self._json(failure, _ERRORS[provider](failure), headers)
+            return
+
+        if handler == self._ghost_upload:
+            handler(raw, delay)
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._json(400, {"error": "Request body is not JSON"})
+            return
+        handler(body, delay)
+
+    def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _messages(self, body: Dict[str, Any], delay: float):
+        prompt = "\n".join(_text_of(message.get("content", "")) for message in body.get("messages", []))
+        system = body.get("system", "")
+        text = message_text(prompt, body.get("max_tokens", 1024))
+        usage = self.simulator.cache_usage(
+            system, _estimate_tokens(_text_of(system) + prompt), body.get("model", "")
+        )
+        usage["output_tokens"] = _estimate_tokens(text)
+        message = {
+            "id": f"msg_sim_{uuid.uuid4().hex[:20]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+        if not body.get("stream"):
+            time.sleep(delay)
+            self.simulator.cache_prefix(system, body.get("model", ""))
+            self._json(200, message)
+            return
+
+        # Server-sent events; delay is the time to the first token
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(kind: str, data: Dict[str, Any]):
+            data["type"] = kind
+            self.wfile.write(f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(delay)
+        self.simulator.cache_prefix(system, body.get("model", ""))
+        start_usage = dict(usage, output_tokens=1)
+        event("message_start", {"message": dict(message, content=[], stop_reason=None, usage=start_usage)})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        chunk_delay = self.simulator.profile.anthropic.stream_chunk_ms / 1000
+        for chunk in re.findall(r"\S+\s*", text):
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            if chunk_delay:
+                time.sleep(chunk_delay)
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]},
+        })
+        event("message_stop", {})
+
+    def _search(self, body: Dict[str, Any], delay: float):
+        time.sleep(delay)
+        query = body.get("query", "")
+        self._json(200, {
+            "query": query,
+            "answer": None,
+            "images": [],
+            "results": search_results(query, int(body.get("max_results", 5))),
+            "response_time": round(delay, 3),
+        })
+
+    def _predict(self, body: Dict[str, Any], delay: float):
+        time.sleep(delay)
+        instance = (body.get("instances") or [{}])[0]
+        parameters = body.get("parameters", {})
+        width, height = IMAGE_SIZES.get(parameters.get("aspectRatio", "1:1"), IMAGE_SIZES["1:1"])
+        predictions = [
+            {
+                "bytesBase64Encoded": base64.b64encode(
+                    png_bytes(width, height, (instance.get("prompt", ""), i))
+                ).decode("ascii"),
+                "mimeType": "image/png",
+            }
+            for i in range(int(parameters.get("sampleCount", 1)))
+        ]
+        self._json(200, {"predictions": predictions})
+
+    def _ghost_upload(self, raw: bytes, delay: float):
+        time.sleep(delay)
+        if not self.headers.get("Authorization", "").startswith("Ghost "):
+            self._json(401, {"errors": [{"message": "Authorization failed", "type": "UnauthorizedError"}]})
+            return
+
+        content_type = self.headers.get("Content-Type", "")
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + raw
+        )
+        parts = {
+            part.get_param("name", header="content-disposition"): part
+            for part in (message.iter_parts() if message.is_multipart() else [])
+        }
+        file_part = parts.get("file")
+        if file_part is None or not file_part.get_payload(decode=True):
+            self._json(422, {"errors": [{"message": "Please select an image.", "type": "ValidationError"}]})
+            return
+
+        filename = re.sub(r"[^\w.-]+", "-", file_part.get_filename() or "image.jpg")
+        ref = parts["ref"].get_content().strip() if "ref" in parts else None
+        self._json(201, {"images": [{
+            "url": f"{self.simulator.url}/content/images/{time.strftime('%Y/%m')}/{filename}",
+            "ref": ref,
+        }]})
+
+    def _ghost_post(self, body: Dict[str, Any], delay: float):
+        time.sleep(delay)
+        if not self.headers.get("Authorization", "").startswith("Ghost "):
+            self._json(401, {"errors": [{"message": "Authorization failed", "type": "UnauthorizedError"}]})
+            return
+        post = (body.get("posts") or [{}])[0]
+        slug = post.get("slug") or "-".join(re.findall(r"[a-z0-9]+", post.get("title", "post").lower()))
+        self._json(201, {"posts": [dict(
+            post,
+            id=uuid.uuid4().hex[:24],
+            uuid=str(uuid.uuid4()),
+            slug=slug,
+            url=f"{self.simulator.url}/{slug}/",
+            status=post.get("status", "draft"),
+        )]})
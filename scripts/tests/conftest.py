@@ -0,0 +1,12 @@
+"""
+Test setup - make blog_generator importable however pytest is started
+
+Run from the repository root or from scripts/:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
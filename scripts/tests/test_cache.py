@@ -0,0 +1,67 @@
+"""
+Tests for the on-disk response cache
+"""
+
+import pytest
+
+from blog_generator import cache
+from blog_generator.cache import DiskCache, MessageCache
+
+
+class Clock:
+    """Stands in for the time module inside blog_generator.cache"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    store = DiskCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    store.set("key", {"value": 1})
+
+    clock.now += 59
+    assert store.get("key") == {"value": 1}
+    clock.now += 2
+    assert store.get("key") is None
+    assert store.stats()["entries"] == 0
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_least_recently_read_entries_are_evicted_first(tmp_path, clock):
+    store = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    value = "x" * 100  # ~102 bytes as JSON, so two entries fit
+    store.set("a", value)
+    clock.now += 1
+    store.set("b", value)
+    clock.now += 1
+    store.get("a")  # Now more recently used than b
+    clock.now += 1
+    store.set("c", value)
+
+    assert store.get("a") == value
+    assert store.get("b") is None
+    assert store.get("c") == value
+    assert store.stats()["bytes"] <= 250
+
+
+def test_message_cache_modes(tmp_path):
+    request = {"model": "m", "temperature": 0.4, "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+    store = DiskCache(str(tmp_path / "cache.sqlite"))
+
+    MessageCache(store, "read").set(request, {"text": "ignored"})
+    assert MessageCache(store, "readwrite").get(request) is None
+
+    MessageCache(store, "readwrite").set(request, {"text": "hello"})
+    assert MessageCache(store, "read").get(request) == {"text": "hello"}
+    assert MessageCache(store, "off").get(request) is None
+    assert MessageCache(store, "read").get(dict(request, temperature=0.5)) is None
@@ -0,0 +1,125 @@
+"""
+Tests for the pipeline dependency graph
+"""
+
+import asyncio
+
+import pytest
+
+from blog_generator.graph import PipelineGraph, Stage
+
+
+def stage(name, inputs, outputs, func):
+    return Stage(name=name, func=func, inputs=tuple(inputs), outputs=tuple(outputs))
+
+
+def test_dependencies_come_from_declared_inputs_and_outputs():
+    async def noop(state):
+        return {}
+
+    graph = PipelineGraph([
+        stage("write", ["plan", "research"], ["content"], noop),
+        stage("plan", ["topic"], ["plan"], noop),
+        stage("research", ["topic"], ["research"], noop),
+    ])
+
+    assert graph.dependencies == {"write": {"plan", "research"}, "plan": set(), "research": set()}
+    assert graph.order.index("write") > graph.order.index("plan")
+    assert graph.order.index("write") > graph.order.index("research")
+
+
+def test_independent_stages_run_concurrently_and_dependents_see_their_outputs():
+    events = []
+
+    def producer(key):
+        async def run(state):
+            events.append(f"start {key}")
+            await asyncio.sleep(0.01)
+            events.append(f"end {key}")
+            return {key: key.upper()}
+        return run
+
+    async def combine(state):
+        return {"content": state["plan"] + state["research"]}
+
+    graph = PipelineGraph([
+        stage("plan", ["topic"], ["plan"], producer("plan")),
+        stage("research", ["topic"], ["research"], producer("research")),
+        stage("write", ["plan", "research"], ["content"], combine),
+    ])
+    state = asyncio.run(graph.run({"topic": "t"}))
+
+    assert events[:2] == ["start plan", "start research"]
+    assert state["content"] == "PLANRESEARCH"
+
+
+def test_only_declared_outputs_are_merged():
+    async def plan(state):
+        return {"plan": "outline", "topic": "overwritten", "extra": 1}
+
+    state = asyncio.run(PipelineGraph([stage("plan", ["topic"], ["plan"], plan)]).run({"topic": "t"}))
+
+    assert state == {"topic": "t", "plan": "outline"}
+
+
+def test_stage_error_cancels_running_stages_and_skips_dependents():
+    cancelled = []
+    started = []
+
+    async def slow(state):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+        return {"slow": 1}
+
+    async def failing(state):
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def dependent(state):
+        started.append("dependent")
+        return {"after": 1}
+
+    graph = PipelineGraph([
+        stage("slow", [], ["slow"], slow),
+        stage("failing", [], ["failed"], failing),
+        stage("dependent", ["failed"], ["after"], dependent),
+    ])
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(graph.run({}))
+
+    assert cancelled == ["slow"]
+    assert started == []
+
+
+def test_completed_stages_are_merged_without_running():
+    ran = []
+
+    def record(name, outputs):
+        async def run(state):
+            ran.append(name)
+            return outputs
+        return run
+
+    graph = PipelineGraph([
+        stage("plan", ["topic"], ["plan"], record("plan", {"plan": "new"})),
+        stage("write", ["plan"], ["content"], record("write", {"content": "text"})),
+    ])
+    state = asyncio.run(graph.run({"topic": "t"}, completed={"plan": {"plan": "saved", "stray": 1}}))
+
+    assert ran == ["write"]
+    assert state == {"topic": "t", "plan": "saved", "content": "text"}
+
+
+def test_invalid_graphs_are_rejected():
+    async def noop(state):
+        return {}
+
+    with pytest.raises(ValueError, match="produced by both"):
+        PipelineGraph([stage("a", [], ["x"], noop), stage("b", [], ["x"], noop)])
+    with pytest.raises(ValueError, match="Cycle"):
+        PipelineGraph([stage("a", ["y"], ["x"], noop), stage("b", ["x"], ["y"], noop)])
+    with pytest.raises(ValueError, match="Duplicate"):
+        PipelineGraph([stage("a", [], ["x"], noop), stage("a", [], ["y"], noop)])
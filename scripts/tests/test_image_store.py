@@ -0,0 +1,87 @@
+"""
+Tests for the content-addressed image store and its garbage collection
+"""
+
+import asyncio
+import os
+
+from blog_generator import image_store
+from blog_generator.image_store import ImageStore, image_format
+
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def make_store(tmp_path, mode="readwrite"):
+    return ImageStore(str(tmp_path / "cache" / "images.sqlite"), str(tmp_path / "images"), mode=mode)
+
+
+def put(store, data, slug, key=None):
+    return asyncio.run(store.put(data, slug, key))
+
+
+def test_images_are_named_by_content_and_format(tmp_path):
+    store = make_store(tmp_path)
+    first = put(store, PNG + b"one", "post")
+    again = put(store, PNG + b"one", "other-post")
+
+    assert first == again
+    assert first.startswith("post-") and first.endswith(".png")
+    assert put(store, b"\xff\xd8\xff" + b"two", "post").endswith(".jpg")
+    assert image_format(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ("webp", "image/webp")
+
+
+def test_prompt_keys_are_reused_until_the_file_is_gone(tmp_path):
+    store = make_store(tmp_path)
+    key = ImageStore.prompt_key("A  Cloud", "imagen", "16:9")
+    filename = put(store, PNG + b"one", "post", key)
+
+    assert store.lookup(ImageStore.prompt_key("a cloud", "imagen", "16:9")) == filename
+    os.remove(tmp_path / "images" / filename)
+    assert store.lookup(key) is None
+
+
+def test_read_mode_does_not_drop_rows_for_missing_files(tmp_path):
+    writer = make_store(tmp_path)
+    key = ImageStore.prompt_key("a cloud", "imagen", "16:9")
+    filename = put(writer, PNG + b"one", "post", key)
+    os.remove(tmp_path / "images" / filename)
+
+    reader = make_store(tmp_path, mode="read")
+    assert reader.lookup(key) is None
+    assert writer.stats()["images"] == 1
+
+
+class Clock:
+    """Stands in for the time module inside blog_generator.image_store"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_garbage_collection_removes_unreferenced_images_and_variants(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(image_store, "time", clock)
+    store = make_store(tmp_path)
+    kept = put(store, PNG + b"kept", "post")
+    dropped = put(store, PNG + b"dropped", "post")
+    stem = os.path.splitext(dropped)[0]
+    variant = tmp_path / "images" / f"{stem}-480w.webp"
+    variant.write_bytes(b"variant")
+
+    # Recently used images keep their grace period
+    clock.now += 3599
+    assert store.collect_garbage({kept}, min_age_seconds=3600) == []
+
+    clock.now += 2
+    listed = store.collect_garbage({kept}, min_age_seconds=3600, dry_run=True)
+    assert sorted(os.path.basename(path) for path in listed) == sorted([dropped, variant.name])
+    assert variant.exists()
+
+    removed = store.collect_garbage({kept}, min_age_seconds=3600)
+    assert sorted(removed) == sorted(listed)
+    assert sorted(os.listdir(tmp_path / "images")) == [kept]
+    assert store.stats()["images"] == 1
@@ -0,0 +1,53 @@
+"""
+Tests for research deduplication, ranking and passage retrieval
+"""
+
+from blog_generator.prompts import estimate_tokens
+from blog_generator.retrieval import PassageIndex, bm25_scores, dedupe
+
+
+ARTICLE = (
+    "Kubernetes autoscaling adjusts the number of pods in a deployment based on observed "
+    "CPU utilisation or custom metrics, so clusters follow demand instead of being sized "
+    "for the peak. Teams combine the horizontal pod autoscaler with cluster autoscaling."
+)
+
+
+def test_dedupe_keeps_the_longest_of_near_duplicates():
+    syndicated = ARTICLE + " Republished with permission."
+    unrelated = "Serverless functions bill per invocation and scale to zero when idle, which suits spiky traffic."
+
+    assert dedupe([ARTICLE, syndicated, unrelated]) == [1, 2]
+    assert dedupe([ARTICLE, unrelated]) == [0, 1]
+    assert dedupe([]) == []
+
+
+def test_bm25_ranks_documents_by_query_terms():
+    documents = [
+        "Serverless pricing and cold starts.",
+        "Autoscaling Kubernetes pods with the horizontal pod autoscaler; autoscaling saves cost.",
+        "Kubernetes networking basics.",
+    ]
+    scores = bm25_scores(documents, "kubernetes autoscaling")
+
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+    assert bm25_scores([], "anything") == []
+
+
+def test_passage_index_returns_matching_passages_within_budget():
+    passages = [
+        "Autoscaling Kubernetes pods follows CPU demand.",
+        "Serverless functions scale to zero.",
+        "Kubernetes autoscaling needs resource requests on every pod. " * 5,
+        "Observability relies on metrics, logs and traces.",
+    ]
+    index = PassageIndex(passages)
+
+    assert index.rank("kubernetes autoscaling", token_budget=10_000) == [0, 2]
+    # The longer passage no longer fits; the next one that does is still returned
+    budget = estimate_tokens(passages[0])
+    assert index.rank("kubernetes autoscaling", token_budget=budget) == [0]
+    assert index.search("kubernetes autoscaling", token_budget=budget) == [passages[0]]
+    assert index.rank("quantum chemistry", token_budget=10_000) == []
+    assert PassageIndex([]).rank("anything", token_budget=100) == []